@@ -1,10 +1,13 @@
 from crewai import Agent, Task
 
+# Nothing in here depends on a particular transcript: task descriptions carry a
+# {text} placeholder that CrewAI fills in from crew.kickoff(inputs={"text": ...}),
+# so agents and tasks can be built once and reused across runs.
 
-def create_summarizer_agent(text, llm):
+def create_summarizer_agent(llm):
     return Agent(
         role="Meeting Summarizer",
-        goal=f"Summarize the meeting in very comprehensive and concise way: {text}",
+        goal="Summarize the meeting in very comprehensive and concise way.",
         backstory="""You are an extremely experienced secretary who summarizes the meeting in a concise and
                     comprehensive form without skipping the important points that were discussed during the meeting.
                     This helps the company stakeholders stay updated.""",
@@ -33,16 +36,18 @@ def create_report_generator_agent(llm):
         verbose=True,
     )
 
-def create_task1(text, summarizer_agent):
+def create_task1(summarizer_agent):
     return Task(
-        description=f"Summarize the given {text} transcription of the meeting in a very comprehensive way in 300 words.",
+        name="summarize",
+        description="Summarize the given {text} transcription of the meeting in a very comprehensive way in 300 words.",
         expected_output="2-3 paragraphs perfectly formatted",
         agent=summarizer_agent,
     )
 
-def create_task2(text, consultant_agent):
+def create_task2(consultant_agent):
     return Task(
-        description=f"Go through the {text} and wherever a roadblock is encountered or a better approach to the problem is available, suggest breakthroughs.",
+        name="consult",
+        description="Go through the {text} and wherever a roadblock is encountered or a better approach to the problem is available, suggest breakthroughs.",
         expected_output="""Problem: Describe the problem \n
                            Current approach: What is the current decided approach of the team \n
                            Suggested approach: A better approach to the problem than the one currently decided by the team \n""",
@@ -51,7 +56,8 @@ def create_task2(text, consultant_agent):
 
 def create_task3(task1, task2, report_generator_agent):
     return Task(
-        description=f"Take the outputs of other tasks and generate a report summary which is very high-level and can be comprehended by non-technical readers",
+        name="report",
+        description="Take the outputs of other tasks and generate a report summary which is very high-level and can be comprehended by non-technical readers",
         expected_output="""Meeting Summary (This heading shall be in the center of the document) \n\n
                           The whole document summary in paragraphs.
                           Encountered Problems: Only list the problems in bullet points, not the breakthroughs.
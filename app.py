@@ -2,8 +2,11 @@
 import os
 import requests
 import sys
+import threading
+import time
 import importlib
 import streamlit as st
+from requests.adapters import HTTPAdapter
 # try:
 #     import pysqlite3  # wheels import under this name
 # except Exception:
@@ -12,60 +15,103 @@ import streamlit as st
 
 API_BASE = os.getenv("API_BASE", "http://localhost:8000")
 TIMEOUT  = 60
+# GETs younger than this are served from the local cache without a request;
+# older ones are revalidated with If-None-Match / If-Modified-Since
+CACHE_TTL = float(os.getenv("API_CACHE_TTL", "15"))
 
 st.set_page_config(page_title="Meeting Summarizer — Demo", layout="wide")
 st.title("Meeting Summarizer — Demo")
 
 # ---------------- helpers ----------------
-def api_get(path: str):
+@st.cache_resource
+def http_session() -> requests.Session:
+    """One pooled keep-alive session shared by every rerun and user of this app."""
+    s = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=32)
+    s.mount("http://", adapter)
+    s.mount("https://", adapter)
+    return s
+
+@st.cache_resource
+def response_cache() -> dict:
+    """path -> {"data", "etag", "last_modified", "fetched"} for responses that carry validators."""
+    return {"_lock": threading.Lock()}
+
+def api_get(path: str, force: bool = False, ttl: float = CACHE_TTL):
+    """
+    GET with a TTL cache and conditional revalidation. `force` skips the TTL
+    (but still sends validators, so unchanged data comes back as a cheap 304).
+    """
+    cache = response_cache()
+    with cache["_lock"]:
+        entry = cache.get(path)
+    if entry and not force and time.time() - entry["fetched"] < ttl:
+        return entry["data"], None
+
+    headers = {}
+    if entry and entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    elif entry and entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
     try:
-        r = requests.get(f"{API_BASE}{path}", timeout=TIMEOUT)
+        r = http_session().get(f"{API_BASE}{path}", headers=headers, timeout=TIMEOUT)
+        if r.status_code == 304 and entry:
+            entry["fetched"] = time.time()
+            return entry["data"], None
         r.raise_for_status()
-        return r.json(), None
+        data = r.json()
     except Exception as e:
         return None, str(e)
 
+    etag, last_modified = r.headers.get("ETag"), r.headers.get("Last-Modified")
+    with cache["_lock"]:
+        if etag or last_modified:
+            cache[path] = {"data": data, "etag": etag, "last_modified": last_modified, "fetched": time.time()}
+        else:
+            cache.pop(path, None)
+    return data, None
+
 def api_post(path: str, json_body: dict):
     try:
-        r = requests.post(f"{API_BASE}{path}", json=json_body, timeout=TIMEOUT)
+        r = http_session().post(f"{API_BASE}{path}", json=json_body, timeout=TIMEOUT)
         r.raise_for_status()
         return r.json(), None
     except Exception as e:
         return None, str(e)
 
 def ensure_projects_cached(force=False):
-    if force or "_projects_cache" not in st.session_state or st.session_state["_projects_cache"] is None:
-        data, err = api_get("/projects")
-        if err:
-            st.error(f"Failed to load projects: {err}")
-            st.session_state["_projects_cache"] = []
-        else:
-            projects = data.get("projects") if isinstance(data, dict) else data
-            st.session_state["_projects_cache"] = projects or []
+    # Cheap on every rerun: within CACHE_TTL it never leaves the process,
+    # after that it's a conditional request that usually comes back 304.
+    data, err = api_get("/projects", force=force)
+    if err:
+        st.error(f"Failed to load projects: {err}")
+        st.session_state["_projects_cache"] = []
+    else:
+        projects = data.get("projects") if isinstance(data, dict) else data
+        st.session_state["_projects_cache"] = projects or []
 
 def load_transcripts_for(project: str, force=False):
     key = f"_transcripts_{project}"
-    if force or key not in st.session_state or st.session_state[key] is None:
-        data, err = api_get(f"/transcripts/{project}")
-        if err or (isinstance(data, dict) and data.get("error")):
-            st.error(f"Failed to load transcripts for '{project}': {err or data.get('error')}")
-            st.session_state[key] = []
+    data, err = api_get(f"/transcripts/{project}", force=force)
+    if err or (isinstance(data, dict) and data.get("error")):
+        st.error(f"Failed to load transcripts for '{project}': {err or data.get('error')}")
+        st.session_state[key] = []
+    else:
+        if isinstance(data, dict) and "transcripts" in data:
+            st.session_state[key] = data["transcripts"]
         else:
-            if isinstance(data, dict) and "transcripts" in data:
-                st.session_state[key] = data["transcripts"]
+            items = data or []
+            if items and isinstance(items[0], str):
+                st.session_state[key] = [
+                    {"label": f.replace("meeting_","").replace(".txt",""), "filename": f}
+                    for f in items
+                ]
             else:
-                items = data or []
-                if items and isinstance(items[0], str):
-                    st.session_state[key] = [
-                        {"label": f.replace("meeting_","").replace(".txt",""), "filename": f}
-                        for f in items
-                    ]
-                else:
-                    st.session_state[key] = items
+                st.session_state[key] = items
 
 def delete_project(project: str) -> tuple[bool, str]:
     try:
-        r = requests.delete(f"{API_BASE}/projects/{project}",
+        r = http_session().delete(f"{API_BASE}/projects/{project}",
                             json={"confirm": True},
                             timeout=TIMEOUT)
         if r.status_code >= 400:
@@ -82,7 +128,7 @@ with st.sidebar:
     st.header("Server")
     st.code(API_BASE)
     if st.button("Health check"):
-        data, err = api_get("/health")
+        data, err = api_get("/health", force=True)
         if err:
             st.error(f"Health error: {err}")
         else:
@@ -269,10 +315,13 @@ if page == "Summaries":
     # Row 3: Get Summary
     if st.button("Get Summary", use_container_width=True):
         with st.spinner("Generating summary…"):
-            resp, err = api_post("/summarize", {
-                "project_name": chosen_proj,
-                "transcript_file": chosen_file
-            })
+            # Already summarized? Comes from the local cache or as a 304.
+            resp, err = api_get(f"/summaries/{chosen_proj}/{chosen_file}")
+            if err or not (isinstance(resp, dict) and resp.get("summary")):
+                resp, err = api_post("/summarize", {
+                    "project_name": chosen_proj,
+                    "transcript_file": chosen_file
+                })
             if err or (isinstance(resp, dict) and resp.get("error")):
                 st.error(f"Summarize failed: {err or resp.get('error')}")
             else:
@@ -0,0 +1,279 @@
+# batch_summarizer.py
+import fnmatch, os, threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from cache_manager import get_summary, save_summary
+from job_state import JobDocs, Snapshot, is_live
+from metrics import approx_tokens
+from rate_limit import TokenBucket
+from storage import get_storage
+from summarizer import run_summary
+
+# Job state lives in shared storage so a restarted server (or another replica) can pick it up again
+JOBS_DIR = "batch_jobs"
+
+# Global limits, shared by every project being backfilled
+MAX_CONCURRENCY   = int(os.getenv("BATCH_MAX_CONCURRENCY", "2"))
+TOKENS_PER_MINUTE = int(os.getenv("BATCH_TOKENS_PER_MINUTE", "200000"))
+
+# Rough token estimate for one run_summary call: the transcript is sent to
+# several prompts, plus room for the three generated outputs.
+PROMPT_COPIES     = 2
+OUTPUT_ALLOWANCE  = 2000
+
+_executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENCY, thread_name_prefix="batch-summarize")
+_budget   = TokenBucket(rate=TOKENS_PER_MINUTE / 60.0, capacity=TOKENS_PER_MINUTE)
+_lock     = threading.Lock()
+_jobs: Dict[str, Dict[str, Any]] = {}  # project -> job state (mirrored to JOBS_DIR in storage)
+_docs     = JobDocs(JOBS_DIR)
+_stopping = threading.Event()  # set (under _lock) by stop_jobs()
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate tokens, times the number of prompts the transcript appears in."""
+    return approx_tokens(text) * PROMPT_COPIES + OUTPUT_ALLOWANCE
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _snapshot(job: Dict[str, Any]) -> Snapshot:
+    """Serialize job state; call under _lock and _docs.write() the result after releasing it."""
+    job["updated_at"] = _now()
+    return _docs.snapshot(job["project"], job)
+
+
+def progress(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Public view of a job: overall status, per-status counts and per-file status."""
+    counts: Dict[str, int] = {}
+    for item in job["items"].values():
+        counts[item["status"]] = counts.get(item["status"], 0) + 1
+    return {
+        "project": job["project"],
+        "status": job["status"],
+        "total": len(job["items"]),
+        "counts": counts,
+        "created_at": job.get("created_at"),
+        "updated_at": job.get("updated_at"),
+        "items": {name: dict(item) for name, item in job["items"].items()},
+    }
+
+
+def get_job(project: str) -> Optional[Dict[str, Any]]:
+    with _lock:
+        job = _jobs.get(project)
+        if job:
+            return progress(job)
+    job = _docs.read(project)  # finished, or running on another replica
+    return progress(job) if job else None
+
+
+def _finish_if_done(job: Dict[str, Any]) -> None:
+    if job["status"] == "running" and not any(
+        i["status"] in ("pending", "running") for i in job["items"].values()
+    ):
+        job["status"] = "done"
+        print(f"[batch] {job['project']}: done")
+
+
+def _set_item(project: str, filename: str, **fields) -> None:
+    with _lock:
+        job = _jobs.get(project)
+        if not job or filename not in job["items"]:
+            return  # project deleted while this item was in flight
+        if _stopping.is_set():
+            return  # released to the next owner; its summary is cached, so it resumes as a hit
+        job["items"][filename].update(fields)
+        _finish_if_done(job)
+        snap = _snapshot(job)
+    _docs.write(snap)
+
+
+def _cancelled_elsewhere(project: str) -> bool:
+    """Another replica deleted the project while we run its job: drop the job."""
+    if not _docs.cancel_requested(project):
+        return False
+    print(f"[batch] {project}: cancelled by another replica")
+    forget_job(project)
+    _docs.clear_cancel(project)
+    return True
+
+
+def _run_item(project: str, filename: str) -> None:
+    if _cancelled_elsewhere(project):
+        return
+    with _lock:
+        job = _jobs.get(project)
+        if _stopping.is_set() or not job or job["status"] != "running":
+            return
+        tdir = job["transcripts_dir"]
+    _set_item(project, filename, status="running")
+    try:
+        text = get_storage().read_text(f"{tdir}/{filename}")
+        # Already summarized (by an earlier run or another request)?
+        if get_summary(text):
+            _set_item(project, filename, status="cached")
+            return
+        _budget.acquire(estimate_tokens(text))
+        result = run_summary(text)
+        save_summary(text, result, project=project, filename=filename, scoped=False)
+        _set_item(project, filename, status="done")
+    except Exception as e:
+        print(f"[batch] {project}/{filename} failed:", e)
+        _set_item(project, filename, status="failed", error=str(e))
+
+
+def _schedule(job: Dict[str, Any]) -> None:
+    for filename, item in job["items"].items():
+        if item["status"] == "pending":
+            _executor.submit(_run_item, job["project"], filename)
+
+
+def start_job(project: str, transcripts_dir: str) -> Dict[str, Any]:
+    """
+    List the project's transcripts and schedule every one of them; workers
+    mark cache hits as "cached" without calling the LLM. If a job for this
+    project is already running (here or on another replica), return its progress.
+    """
+    with _lock:
+        current = _jobs.get(project)
+        if current and current["status"] == "running":
+            return progress(current)
+    other = _docs.read(project)
+    if other and other.get("status") == "running" and is_live(other):
+        return progress(other)
+
+    # Listing can be slow (S3); don't hold the lock other jobs need meanwhile
+    found = [o for o in get_storage().list(transcripts_dir, recursive=False)
+             if fnmatch.fnmatch(o.name, "meeting_*.txt")]
+    items = {o.name: {"status": "pending"} for o in sorted(found, key=lambda o: o.mtime)}
+    _docs.clear_cancel(project)  # left over from cancelling an earlier job
+
+    with _lock:
+        current = _jobs.get(project)
+        if current and current["status"] == "running":
+            return progress(current)  # lost a race with another start_job
+        job = {
+            "project": project,
+            "transcripts_dir": transcripts_dir,
+            "status": "running",
+            "created_at": _now(),
+            "items": items,
+        }
+        _finish_if_done(job)
+        _jobs[project] = job
+        snap = _snapshot(job)
+        view = progress(job)
+    _docs.write(snap)
+    _schedule(job)
+    _docs.start_heartbeat(_heartbeat)
+    print(f"[batch] {project}: {len(items)} transcripts scheduled")
+    return view
+
+
+def resume_jobs() -> int:
+    """
+    Take over unfinished jobs whose owner is gone (this process before a
+    restart, or a replica that died). Jobs another live replica is running
+    are left alone. Returns jobs resumed.
+    """
+    _docs.start_heartbeat(_heartbeat)
+    with _lock:
+        if _stopping.is_set():
+            return 0
+        mine = set(_jobs)
+    resumed = 0
+    for job in _docs.claim_stale(skip=mine):
+        # Items that were in flight when the owner died start over
+        for item in job["items"].values():
+            if item["status"] == "running":
+                item["status"] = "pending"
+        with _lock:
+            if _stopping.is_set() or job["project"] in _jobs:
+                continue
+            _jobs[job["project"]] = job
+            snap = _snapshot(job)
+        _docs.write(snap)
+        _schedule(job)
+        print(f"[batch] {job['project']}: resumed")
+        resumed += 1
+    return resumed
+
+
+def _heartbeat() -> None:
+    """Refresh the lease on our running jobs, honour cancels from other replicas, adopt orphans."""
+    with _lock:
+        running = [p for p, j in _jobs.items() if j["status"] == "running"]
+    for project in running:
+        if _cancelled_elsewhere(project):
+            continue
+        with _lock:
+            job = _jobs.get(project)
+            if _stopping.is_set() or not job or job["status"] != "running":
+                continue
+            snap = _snapshot(job)
+        _docs.write(snap)
+    resume_jobs()
+
+
+def stop_jobs() -> int:
+    """
+    Shutdown: skip queued items, and release the running jobs so the next
+    process (or another replica) resumes them at once instead of waiting
+    out the lease. Items already calling the LLM finish and are cached, but
+    no longer update the job. Returns jobs released.
+    """
+    with _lock:
+        _stopping.set()
+        running = [j for j in _jobs.values() if j["status"] == "running"]
+    _executor.shutdown(wait=False, cancel_futures=True)
+    for job in running:
+        try:
+            _docs.release(job["project"], job)
+        except Exception as e:
+            print(f"[batch] {job['project']}: could not release job:", e)
+    if running:
+        print(f"[batch] released {len(running)} running job(s)")
+    return len(running)
+
+
+def is_running(project: str) -> bool:
+    """True while a job for `project` is running here or on another live replica."""
+    with _lock:
+        job = _jobs.get(project)
+        if job:
+            return job["status"] == "running"
+    doc = _docs.read(project)
+    return bool(doc and doc.get("status") == "running" and is_live(doc))
+
+
+def forget_job(project: str) -> None:
+    """Cancel the project's job (pending items are skipped) and delete its state."""
+    with _lock:
+        job = _jobs.pop(project, None)
+        if job:
+            job["status"] = "cancelled"
+    if job is None:
+        doc = _docs.read(project)
+        if doc and doc.get("status") == "running" and is_live(doc):
+            _docs.request_cancel(project)  # the owner stops it on its next heartbeat
+    _docs.delete(project)
+
+
+def rename_job(old: str, new: str, transcripts_dir: str) -> None:
+    """Carry a finished job's state over to a renamed project."""
+    with _lock:
+        job = _jobs.pop(old, None)
+    job = job or _docs.read(old)
+    if not job:
+        return
+    with _lock:
+        job["project"] = new
+        job["transcripts_dir"] = transcripts_dir
+        _jobs[new] = job
+        snap = _snapshot(job)
+    _docs.write(snap)
+    _docs.delete(old)
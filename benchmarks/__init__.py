@@ -0,0 +1,9 @@
+"""
+Offline benchmark and load-test suite.
+
+Run from the repo root, e.g.:
+    python -m benchmarks.load_scenarios --scenario all
+
+Nothing here talks to Gemini or recall.ai: `fake_llm` stands in for the
+LLM and `recall_stub` serves the Recall endpoints locally.
+"""
@@ -0,0 +1,142 @@
+# benchmarks/common.py
+import json, os, resource, socket, sys, tempfile, threading, time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Callable, List, Optional
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+
+def isolated_workdir(prefix: str = "bench_") -> Path:
+    """
+    chdir into a fresh temp dir. The app resolves transcripts_projects/ and
+    summary_cache/ relative to the cwd at import time, so call this *before*
+    importing webhook_fastapi.
+    """
+    d = Path(tempfile.mkdtemp(prefix=prefix))
+    os.chdir(d)
+    return d
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process (ru_maxrss is KiB on Linux, bytes on macOS)."""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def percentile(values: List[float], p: float) -> float:
+    if not values:
+        return 0.0
+    xs = sorted(values)
+    k = (len(xs) - 1) * p / 100.0
+    lo, hi = int(k), min(int(k) + 1, len(xs) - 1)
+    return xs[lo] + (xs[hi] - xs[lo]) * (k - lo)
+
+
+@dataclass
+class Result:
+    scenario: str
+    requests: int
+    concurrency: int
+    errors: int
+    wall_sec: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    throughput_rps: float
+    peak_rss_mb: float
+    extra: dict = field(default_factory=dict)
+
+    def line(self) -> str:
+        s = (f"{self.scenario:<28} n={self.requests:<5} c={self.concurrency:<3} "
+             f"err={self.errors:<3} p50={self.p50_ms:8.1f}ms p95={self.p95_ms:8.1f}ms "
+             f"p99={self.p99_ms:8.1f}ms  {self.throughput_rps:8.1f} req/s  "
+             f"rss={self.peak_rss_mb:.0f}MB")
+        if self.extra:
+            s += "  " + " ".join(f"{k}={v}" for k, v in self.extra.items())
+        return s
+
+
+def run_load(scenario: str, fn: Callable[[int], bool], n: int, concurrency: int) -> Result:
+    """
+    Call fn(i) for i in range(n) across `concurrency` threads.
+    fn returns True on success; exceptions count as errors.
+    """
+    latencies: List[float] = []
+    errors = 0
+    lock = threading.Lock()
+
+    def one(i: int):
+        nonlocal errors
+        t0 = time.perf_counter()
+        try:
+            ok = fn(i)
+        except Exception:
+            ok = False
+        dt = time.perf_counter() - t0
+        with lock:
+            latencies.append(dt)
+            if not ok:
+                errors += 1
+
+    t_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as ex:
+        list(ex.map(one, range(n)))
+    wall = time.perf_counter() - t_start
+    return Result(
+        scenario=scenario,
+        requests=n,
+        concurrency=concurrency,
+        errors=errors,
+        wall_sec=round(wall, 3),
+        p50_ms=percentile(latencies, 50) * 1000,
+        p95_ms=percentile(latencies, 95) * 1000,
+        p99_ms=percentile(latencies, 99) * 1000,
+        throughput_rps=n / wall if wall else 0.0,
+        peak_rss_mb=peak_rss_mb(),
+    )
+
+
+class AppServer:
+    """Run a FastAPI app under uvicorn in a background thread."""
+
+    def __init__(self, app, port: Optional[int] = None):
+        import uvicorn
+        self.port = port or free_port()
+        config = uvicorn.Config(app, host="127.0.0.1", port=self.port, log_level="warning")
+        self._server = uvicorn.Server(config)
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def start(self, timeout: float = 30.0) -> "AppServer":
+        self._thread.start()
+        deadline = time.time() + timeout
+        while not self._server.started:
+            if time.time() > deadline:
+                raise RuntimeError("uvicorn did not start")
+            time.sleep(0.05)
+        return self
+
+    def stop(self):
+        self._server.should_exit = True
+        self._thread.join(timeout=10)
+
+
+def report(results: List[Result], json_path: Optional[str] = None):
+    for r in results:
+        print(r.line())
+    if json_path:
+        Path(json_path).write_text(json.dumps([asdict(r) for r in results], indent=2), encoding="utf-8")
+        print("[bench] wrote", json_path)
@@ -0,0 +1,48 @@
+# benchmarks/dispatch_burst.py
+"""
+Bot-join burst: N bots created one blocking call at a time (the old
+/start_bot loop) vs one bot_dispatcher batch, against the local Recall stub.
+
+    python -m benchmarks.dispatch_burst --meetings 60 --recall-latency 0.3
+"""
+import argparse, os, time
+
+from benchmarks.common import isolated_workdir
+from benchmarks.recall_stub import RecallStub
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--meetings", type=int, default=60)
+    ap.add_argument("--recall-latency", type=float, default=0.3, help="stub latency per request (sec)")
+    args = ap.parse_args()
+
+    isolated_workdir()
+    stub = RecallStub(latency_sec=args.recall_latency).start()
+    os.environ["RECALLAI_API_KEY"] = "bench"
+    os.environ["RECALLAI_BASE_URL"] = stub.api_base
+
+    from create_bot import req_bot
+    import bot_dispatcher
+
+    meetings = [{"meeting_url": f"https://meet.google.com/bench-{i:04d}", "project_name": "bench"}
+                for i in range(args.meetings)]
+
+    t0 = time.perf_counter()
+    for m in meetings:
+        req_bot(m["meeting_url"], project_name=m["project_name"], bot_name="bench")
+    serial = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    batch = bot_dispatcher.start_batch(meetings, project="bench", bot_name="bench")
+    batch = bot_dispatcher.wait_batch(batch["batch_id"])
+    batched = time.perf_counter() - t0
+    stub.stop()
+
+    print(f"serial   {args.meetings} bots in {serial:7.2f}s")
+    print(f"batched  {args.meetings} bots in {batched:7.2f}s  counts={batch['counts']}  "
+          f"(concurrency={bot_dispatcher.MAX_CONCURRENCY}, rate={bot_dispatcher.RATE_PER_SEC}/s)")
+
+
+if __name__ == "__main__":
+    main()
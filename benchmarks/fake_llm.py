@@ -0,0 +1,76 @@
+# benchmarks/fake_llm.py
+import hashlib, random, threading, time
+from typing import Any, Dict, List, Union
+
+from crewai import BaseLLM
+
+_WORDS = (
+    "team discussed roadmap release deadline blocker api latency database migration "
+    "customer feedback design review testing deployment budget hiring priority risk "
+    "action item owner follow up next sprint integration performance security"
+).split()
+
+
+class FakeLLM(BaseLLM):
+    """
+    Deterministic stand-in for `llm_setup.llm`.
+
+    Each call sleeps `latency_sec` plus `output_tokens / tokens_per_sec`, then
+    returns a ReAct-style final answer whose words are seeded from the prompt,
+    so the same input always yields the same output.
+    """
+
+    def __init__(
+        self,
+        latency_sec: float = 0.5,
+        tokens_per_sec: float = 200.0,
+        output_tokens: int = 300,
+        model: str = "fake/benchmark",
+    ):
+        super().__init__(model=model, temperature=0.0)
+        self.latency_sec = latency_sec
+        self.tokens_per_sec = tokens_per_sec
+        self.output_tokens = output_tokens
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    @staticmethod
+    def _prompt_text(messages: Union[str, List[Dict[str, str]]]) -> str:
+        if isinstance(messages, str):
+            return messages
+        return "\n".join(str(m.get("content", "")) for m in messages)
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None, **kwargs: Any) -> str:
+        prompt = self._prompt_text(messages)
+        seed = int(hashlib.sha1(prompt.encode("utf-8")).hexdigest()[:16], 16)
+        rng = random.Random(seed)
+        body = " ".join(rng.choice(_WORDS) for _ in range(self.output_tokens))
+
+        delay = self.latency_sec
+        if self.tokens_per_sec > 0:
+            delay += self.output_tokens / self.tokens_per_sec
+        time.sleep(delay)
+
+        with self._lock:
+            self.calls += 1
+            self.prompt_tokens += len(prompt) // 4
+            self.completion_tokens += self.output_tokens
+        return f"Thought: I now can give a great answer\nFinal Answer: {body}"
+
+    def supports_function_calling(self) -> bool:
+        return False
+
+    def supports_stop_words(self) -> bool:
+        return False
+
+    def get_context_window_size(self) -> int:
+        return 1_000_000
+
+
+def install_fake_llm(fake: FakeLLM) -> FakeLLM:
+    """Swap the fake in wherever the app reads `llm_setup.llm`."""
+    import llm_setup
+    llm_setup.set_llm(fake)
+    return fake
@@ -0,0 +1,132 @@
+# benchmarks/ingest_burst.py
+"""
+Webhook burst: N transcript webhooks arriving at once (meetings ending at the
+top of the hour), against the local Recall stub. Compares the old inline
+handling (poll, download, normalize and write one webhook at a time on the
+event loop) with the ingestion pipeline, parsing in threads vs processes.
+
+    python -m benchmarks.ingest_burst --webhooks 200 --words 8000 --processes 4
+
+Reports how fast webhooks are accepted and sustained transcripts/sec until
+every one of them is on disk.
+"""
+import argparse, os, time
+from pathlib import Path
+
+from benchmarks.common import AppServer, Result, isolated_workdir, peak_rss_mb, report, run_load
+from benchmarks.recall_stub import RecallStub
+
+
+def events(stub: RecallStub, n: int, tag: str) -> list:
+    out = []
+    for i in range(n):
+        key = f"{tag}-{i}"
+        stub.prime(key)
+        if i % 2:
+            # direct download_url in the event
+            out.append({"event": "transcript.done", "data": {"download_url": stub.download_url(key)}})
+        else:
+            # bot id only: look up the bot (and its project), then the transcript URL
+            out.append({"event": "bot.done", "data": {"bot_id": key}})
+    return out
+
+
+def run_inline(stub: RecallStub, evs: list) -> Result:
+    """The pre-pipeline handler: every step blocking, one webhook at a time."""
+    import requests
+    import webhook_fastapi as wf
+    from normalize import parse_download
+
+    session = requests.Session()
+    t0 = time.perf_counter()
+    for i, ev in enumerate(evs):
+        data = ev["data"]
+        url = data.get("download_url")
+        project = "burst"
+        if not url:
+            # project lookup and URL lookup were separate bot GETs
+            bot = session.get(f"{wf.BASE}/bot/{data['bot_id']}/", headers=wf.HEAD, timeout=30).json()
+            project = bot["metadata"]["project"]
+            bot = session.get(f"{wf.BASE}/bot/{data['bot_id']}/", headers=wf.HEAD, timeout=30).json()
+            url = bot["recordings"]["media_shortcuts"]["transcript"]["data"]["download_url"]
+        raw = session.get(url, timeout=120).content
+        wf.store_transcript(project, *parse_download(raw), tag=f"inline{i}")
+    wall = time.perf_counter() - t0
+    n = len(evs)
+    return Result("inline (old)", n, 1, 0, round(wall, 3), 0, 0, 0, round(n / wall, 1), peak_rss_mb(),
+                  extra={"transcripts_per_sec": round(n / wall, 1)})
+
+
+def run_pipeline(stub: RecallStub, evs: list, processes: int, concurrency: int, queue_size: int) -> Result:
+    import requests
+    import webhook_fastapi as wf
+    from ingestion import IngestionPipeline
+
+    wf.ingest = IngestionPipeline(write=wf.store_transcript, recall_base=wf.BASE, recall_headers=wf.HEAD,
+                                  process_workers=processes, queue_size=queue_size)
+    server = AppServer(wf.app).start()
+    time.sleep(1.0)  # let the parse processes finish spawning
+    session = requests.Session()
+    rejected = 0
+
+    def one(i: int) -> bool:
+        nonlocal rejected
+        # bot-only events get their project from the bot's metadata
+        path = "/recall/webhook?project=burst" if i % 2 else "/recall/webhook"
+        r = session.post(f"{server.url}{path}", json=evs[i], timeout=60)
+        if r.status_code == 503:
+            rejected += 1
+        return r.status_code == 202
+
+    try:
+        t0 = time.perf_counter()
+        accept = run_load("accept", one, len(evs), concurrency)
+        while True:
+            s = wf.ingest.stats()
+            if s["ingested"] + s["failed"] + s["not_ready"] >= s["received"]:
+                break
+            time.sleep(0.02)
+        wall = time.perf_counter() - t0
+    finally:
+        server.stop()
+    label = f"pipeline procs={processes}" if processes else "pipeline threads"
+    return Result(label, len(evs), concurrency, accept.errors, round(wall, 3),
+                  accept.p50_ms, accept.p95_ms, accept.p99_ms, accept.throughput_rps, peak_rss_mb(),
+                  extra={"transcripts_per_sec": round(s["ingested"] / wall, 1),
+                         "ingested": s["ingested"], "rejected": rejected, "failed": s["failed"]})
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--webhooks", type=int, default=200)
+    ap.add_argument("--words", type=int, default=8000, help="words per transcript payload")
+    ap.add_argument("--concurrency", type=int, default=50, help="webhooks in flight at once")
+    ap.add_argument("--processes", type=int, default=min(4, os.cpu_count() or 1))
+    ap.add_argument("--queue-size", type=int, default=256)
+    ap.add_argument("--recall-latency", type=float, default=0.05, help="stub latency per request (sec)")
+    ap.add_argument("--skip-inline", action="store_true")
+    ap.add_argument("--json", help="write results to this JSON file")
+    args = ap.parse_args()
+
+    isolated_workdir()
+    stub = RecallStub(latency_sec=args.recall_latency, default_words=args.words, project="burst").start()
+    os.environ["RECALLAI_API_KEY"] = "bench"
+    os.environ["RECALLAI_BASE_URL"] = stub.api_base
+    os.environ["LLM_WARMUP"] = "off"
+
+    results = []
+    if not args.skip_inline:
+        results.append(run_inline(stub, events(stub, args.webhooks, "inline")))
+    results.append(run_pipeline(stub, events(stub, args.webhooks, "threads"), 0,
+                                args.concurrency, args.queue_size))
+    results.append(run_pipeline(stub, events(stub, args.webhooks, "procs"), args.processes,
+                                args.concurrency, args.queue_size))
+    stub.stop()
+
+    print(f"[bench] {args.webhooks} webhooks, {args.words} words each, "
+          f"recall latency {args.recall_latency}s; latencies are webhook accept times")
+    report(results, str(Path(args.json).resolve()) if args.json else None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+# benchmarks/load_scenarios.py
+"""
+Load scenarios against the real FastAPI app, fully offline.
+
+    python -m benchmarks.load_scenarios --scenario all
+    python -m benchmarks.load_scenarios --scenario summarize --requests 50 --concurrency 10
+
+Reports p50/p95/p99 latency, throughput and peak RSS per scenario.
+"""
+import argparse, os, time
+from pathlib import Path
+
+from benchmarks.common import AppServer, isolated_workdir, report, run_load
+from benchmarks.recall_stub import RecallStub
+
+
+def seed_listing(projects_root: Path, project: str, n_files: int) -> None:
+    tdir = projects_root / project / "transcripts"
+    tdir.mkdir(parents=True, exist_ok=True)
+    now = time.time()
+    for i in range(n_files):
+        f = tdir / f"meeting_{i:05d}.txt"
+        f.write_text(f"Meeting transcript #{i}\n" + "-" * 60 + "\nSpeaker 1: hello\n", encoding="utf-8")
+        os.utime(f, (now - i, now - i))
+
+
+def seed_summaries(projects_root: Path, project: str, n_files: int, words: int) -> list[str]:
+    from benchmarks.recall_stub import synthetic_words
+    from normalize import as_plaintext, normalize_segments
+    tdir = projects_root / project / "transcripts"
+    tdir.mkdir(parents=True, exist_ok=True)
+    names = []
+    for i in range(n_files):
+        body = as_plaintext(normalize_segments(synthetic_words(words, seed=f"summ-{i}")))
+        name = f"meeting_summ_{i:04d}.txt"
+        (tdir / name).write_text(f"Meeting transcript #{i}\n" + "-" * 60 + "\n" + body, encoding="utf-8")
+        names.append(name)
+    return names
+
+
+def scenario_webhook(base: str, stub: RecallStub, n: int, c: int, words: list[int]):
+    import requests
+    session = requests.Session()
+
+    def one(i: int) -> bool:
+        size = words[i % len(words)]
+        if i % 2:
+            # direct download_url in the event
+            event = {"event": "transcript.done", "data": {"download_url": stub.download_url(f"wh-{i}", size)}}
+        else:
+            # bot id only: the app has to look up the bot and poll for the URL
+            event = {"event": "bot.done", "data": {"bot_id": f"wh-{i}"}}
+        r = session.post(f"{base}/recall/webhook?project=bench", json=event, timeout=300)
+        # 202: queued for the ingestion pipeline (see benchmarks/ingest_burst.py for throughput)
+        return r.status_code == 202 and r.json().get("ok") is True
+
+    res = run_load("webhook_burst", one, n, c)
+    res.extra["payload_words"] = "/".join(str(w) for w in words)
+    return res
+
+
+def scenario_summarize(base: str, files: list[str], c: int, label: str):
+    import requests
+    session = requests.Session()
+
+    def one(i: int) -> bool:
+        r = session.post(f"{base}/summarize",
+                         json={"project_name": "bench-summ", "transcript_file": files[i]},
+                         timeout=600)
+        return r.status_code == 200 and "summary" in r.json()
+
+    return run_load(label, one, len(files), c)
+
+
+def scenario_listing(base: str, n: int, c: int, n_files: int):
+    import requests
+    session = requests.Session()
+
+    def one(i: int) -> bool:
+        path = "/projects" if i % 4 == 0 else "/transcripts/bench-list"
+        r = session.get(f"{base}{path}", timeout=120)
+        return r.status_code == 200
+
+    res = run_load("listing", one, n, c)
+    res.extra["files"] = n_files
+    return res
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--scenario", choices=["all", "webhook", "summarize", "listing"], default="all")
+    ap.add_argument("--requests", type=int, default=100)
+    ap.add_argument("--concurrency", type=int, default=20)
+    ap.add_argument("--words", default="500,5000,20000", help="comma-separated payload sizes (words)")
+    ap.add_argument("--recall-latency", type=float, default=0.02, help="stub latency per request (sec)")
+    ap.add_argument("--llm-latency", type=float, default=0.2, help="fake LLM base latency per call (sec)")
+    ap.add_argument("--llm-tokens-per-sec", type=float, default=2000.0)
+    ap.add_argument("--llm-output-tokens", type=int, default=200)
+    ap.add_argument("--summaries", type=int, default=20, help="distinct transcripts to summarize")
+    ap.add_argument("--list-files", type=int, default=10_000)
+    ap.add_argument("--json", help="write results to this JSON file")
+    args = ap.parse_args()
+
+    json_path = str(Path(args.json).resolve()) if args.json else None
+    workdir = isolated_workdir()
+
+    stub = RecallStub(latency_sec=args.recall_latency).start()
+    os.environ["RECALLAI_API_KEY"] = "bench"
+    os.environ["RECALLAI_BASE_URL"] = stub.api_base
+    os.environ.pop("WEBHOOK_TOKEN", None)
+
+    import ingestion
+    import webhook_fastapi as wf
+    from storage import get_storage  # seeding writes local files directly
+    # Keep stub latency meaningful: don't wait seconds between polls
+    ingestion.POLL_START_SEC = 0
+
+    results = []
+    run_all = args.scenario == "all"
+    words = [int(w) for w in args.words.split(",") if w.strip()]
+
+    if run_all or args.scenario == "summarize":
+        from benchmarks.fake_llm import FakeLLM, install_fake_llm
+        install_fake_llm(FakeLLM(latency_sec=args.llm_latency,
+                                 tokens_per_sec=args.llm_tokens_per_sec,
+                                 output_tokens=args.llm_output_tokens))
+        files = seed_summaries(get_storage().path(wf.PROJECTS_ROOT), "bench-summ", args.summaries, words[0])
+
+    if run_all or args.scenario == "listing":
+        seed_listing(get_storage().path(wf.PROJECTS_ROOT), "bench-list", args.list_files)
+
+    server = AppServer(wf.app).start()
+    try:
+        if run_all or args.scenario == "webhook":
+            results.append(scenario_webhook(server.url, stub, args.requests, args.concurrency, words))
+        if run_all or args.scenario == "summarize":
+            results.append(scenario_summarize(server.url, files, args.concurrency, "summarize_cold"))
+            results.append(scenario_summarize(server.url, files, args.concurrency, "summarize_cached"))
+        if run_all or args.scenario == "listing":
+            results.append(scenario_listing(server.url, args.requests, args.concurrency, args.list_files))
+    finally:
+        server.stop()
+        stub.stop()
+
+    print(f"[bench] workdir {workdir}")
+    report(results, json_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# benchmarks/pipeline_setup.py
+"""
+Per-call setup overhead of the summarization pipeline: rebuilding agents,
+tasks and crew on every call (the old run_summary) vs checking a crew out
+of the shared SummaryPipeline pool.
+
+    python -m benchmarks.pipeline_setup --calls 200 --concurrency 8
+    python -m benchmarks.pipeline_setup --full        # also run kickoff with the fake LLM
+"""
+import argparse, tracemalloc
+
+from benchmarks.common import report, run_load
+from benchmarks.fake_llm import FakeLLM, install_fake_llm
+from benchmarks.recall_stub import synthetic_words
+
+
+def _measure(label: str, fn, calls: int, concurrency: int):
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    res = run_load(label, fn, calls, concurrency)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    res.extra["py_alloc_peak_kb"] = peak // 1024
+    return res
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--calls", type=int, default=200)
+    ap.add_argument("--concurrency", type=int, default=8)
+    ap.add_argument("--full", action="store_true", help="also time full runs with a zero-latency fake LLM")
+    ap.add_argument("--words", type=int, default=2000)
+    args = ap.parse_args()
+
+    import summarizer
+    from summarizer import SummaryPipeline
+
+    fake = install_fake_llm(FakeLLM(latency_sec=0.0, tokens_per_sec=0, output_tokens=50))
+    summarizer._load()  # import cost is not what we're measuring here
+
+    def rebuild(i: int) -> bool:
+        SummaryPipeline(fake)._build()
+        return True
+
+    shared = SummaryPipeline(fake)
+    shared.prebuild(args.concurrency)
+
+    def pooled(i: int) -> bool:
+        with shared.checkout():
+            return True
+
+    results = [
+        _measure("setup_rebuild_per_call", rebuild, args.calls, args.concurrency),
+        _measure("setup_pooled_checkout", pooled, args.calls, args.concurrency),
+    ]
+    results[-1].extra["crews_built"] = shared.crews_built
+
+    if args.full:
+        words = [w["text"] for e in synthetic_words(args.words, "pipeline") for w in e["words"]]
+        text = "Speaker 1: " + " ".join(words)
+
+        def full_rebuild(i: int) -> bool:
+            return bool(SummaryPipeline(fake).run(text))
+
+        def full_shared(i: int) -> bool:
+            return bool(shared.run(text))
+
+        calls = max(1, args.calls // 10)
+        results.append(_measure("run_rebuild_per_call", full_rebuild, calls, args.concurrency))
+        results.append(_measure("run_shared_pipeline", full_shared, calls, args.concurrency))
+        results[-1].extra["crews_built"] = shared.crews_built
+
+    report(results)
+
+
+if __name__ == "__main__":
+    main()
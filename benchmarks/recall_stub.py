@@ -0,0 +1,184 @@
+# benchmarks/recall_stub.py
+import json, random, re, threading, time, uuid
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+_VOCAB = (
+    "so the plan is to ship the new api by friday and we still need to fix "
+    "the login bug before that also the dashboard is slow on large projects "
+    "maybe we cache the listing and move the export to a background job"
+).split()
+
+
+def synthetic_words(n_words: int, seed: str, speakers: int = 4) -> List[Dict]:
+    """
+    Word-level transcript in Recall's download format: one entry per speaker
+    turn, each with a participant and a list of timestamped words.
+    """
+    rng = random.Random(seed)
+    t0 = datetime(2025, 1, 1, 10, 0, tzinfo=timezone.utc)
+    names = [f"Speaker {i + 1}" for i in range(speakers)]
+    out: List[Dict] = []
+    t = 0.0
+    left = n_words
+    while left > 0:
+        turn = min(left, rng.randint(5, 60))
+        words = []
+        for _ in range(turn):
+            start = t
+            t += rng.uniform(0.15, 0.6)
+            words.append({
+                "text": rng.choice(_VOCAB),
+                "start_timestamp": {"relative": round(start, 3),
+                                    "absolute": (t0 + timedelta(seconds=start)).isoformat()},
+                "end_timestamp": {"relative": round(t, 3),
+                                  "absolute": (t0 + timedelta(seconds=t)).isoformat()},
+            })
+        idx = rng.randrange(speakers)
+        out.append({"participant": {"id": idx, "name": names[idx]}, "words": words})
+        left -= turn
+    return out
+
+
+class RecallStub:
+    """
+    Local stand-in for the recall.ai API.
+
+    Serves `/api/v1/bot/<id>/`, `/api/v1/transcript/<id>/`, `POST /api/v1/bot/`
+    and `/download/<id>.json?words=N`. Point the app at it with
+    RECALLAI_BASE_URL=<stub.api_base>. `latency_sec` is added to every response.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0,
+                 latency_sec: float = 0.0, default_words: int = 2000,
+                 project: str = "bench"):
+        self.latency_sec = latency_sec
+        self.default_words = default_words
+        self.project = project
+        self.requests = 0
+        self._payloads: Dict[tuple, bytes] = {}
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status: int, body: bytes):
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                stub._hit()
+                u = urlparse(self.path)
+                status, body = stub.handle_get(u.path, parse_qs(u.query))
+                self._send(status, body)
+
+            def do_POST(self):
+                stub._hit()
+                length = int(self.headers.get("Content-Length") or 0)
+                raw = self.rfile.read(length) if length else b"{}"
+                status, body = stub.handle_post(urlparse(self.path).path, raw)
+                self._send(status, body)
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def api_base(self) -> str:
+        return f"{self.base_url}/api/v1"
+
+    def download_url(self, key: str, words: Optional[int] = None) -> str:
+        return f"{self.base_url}/download/{key}.json?words={words or self.default_words}"
+
+    def _hit(self):
+        with self._lock:
+            self.requests += 1
+        if self.latency_sec:
+            time.sleep(self.latency_sec)
+
+    def prime(self, key: str, words: Optional[int] = None) -> None:
+        """Build a download payload ahead of time, so generating it isn't part of a measurement."""
+        self._payload(key, words or self.default_words)
+
+    def _payload(self, key: str, words: int) -> bytes:
+        with self._lock:
+            body = self._payloads.get((key, words))
+        if body is None:
+            body = json.dumps(synthetic_words(words, seed=key)).encode("utf-8")
+            with self._lock:
+                self._payloads[(key, words)] = body
+        return body
+
+    def handle_get(self, path: str, query: Dict[str, List[str]]):
+        m = re.fullmatch(r"/api/v1/bot/([^/]+)/", path)
+        if m:
+            bot_id = m.group(1)
+            return 200, json.dumps({
+                "id": bot_id,
+                "metadata": {"project": self.project},
+                "recordings": {"media_shortcuts": {"transcript": {"data": {
+                    "download_url": self.download_url(bot_id),
+                }}}},
+            }).encode("utf-8")
+        m = re.fullmatch(r"/api/v1/transcript/([^/]+)/", path)
+        if m:
+            return 200, json.dumps({"data": {"download_url": self.download_url(m.group(1))}}).encode("utf-8")
+        m = re.fullmatch(r"/download/([^/]+)\.json", path)
+        if m:
+            words = int((query.get("words") or [self.default_words])[0])
+            return 200, self._payload(m.group(1), words)
+        return 404, b'{"detail": "not found"}'
+
+    def handle_post(self, path: str, raw: bytes):
+        if path == "/api/v1/bot/":
+            try:
+                payload = json.loads(raw or b"{}")
+            except ValueError:
+                return 400, b'{"detail": "bad json"}'
+            return 201, json.dumps({
+                "id": str(uuid.uuid4()),
+                "meeting_url": payload.get("meeting_url"),
+                "bot_name": payload.get("bot_name"),
+                "join_at": payload.get("join_at"),
+                "metadata": payload.get("metadata") or {},
+            }).encode("utf-8")
+        return 404, b'{"detail": "not found"}'
+
+    def start(self) -> "RecallStub":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser(description="Run the local Recall stand-in server")
+    ap.add_argument("--port", type=int, default=8099)
+    ap.add_argument("--latency", type=float, default=0.0)
+    ap.add_argument("--words", type=int, default=2000)
+    args = ap.parse_args()
+    stub = RecallStub(port=args.port, latency_sec=args.latency, default_words=args.words).start()
+    print("Recall stub on", stub.api_base)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        stub.stop()
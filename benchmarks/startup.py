@@ -0,0 +1,80 @@
+# benchmarks/startup.py
+"""
+Startup-time benchmark: import time of webhook_fastapi and time from process
+spawn to the first 200 from /health, with the LLM stack loaded eagerly
+(the old behaviour) vs lazily.
+
+    python -m benchmarks.startup --runs 5
+"""
+import argparse, os, statistics, subprocess, sys, tempfile, time
+
+import requests
+
+from benchmarks.common import REPO_ROOT, free_port
+
+IMPORT_SNIPPET = """
+import time
+t0 = time.perf_counter()
+import webhook_fastapi
+{extra}
+print(time.perf_counter() - t0)
+"""
+
+
+def _env(mode: str) -> dict:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = str(REPO_ROOT) + os.pathsep + env.get("PYTHONPATH", "")
+    env.setdefault("RECALLAI_API_KEY", "bench")
+    env["LLM_WARMUP"] = mode
+    return env
+
+
+def import_time(mode: str) -> float:
+    # "eager" reproduces the old module-level `from summarizer import run_summary`
+    # pulling in crewai and building the LLM at import time.
+    extra = "import summarizer; summarizer.warm_up()" if mode == "eager" else ""
+    with tempfile.TemporaryDirectory() as d:
+        out = subprocess.run([sys.executable, "-c", IMPORT_SNIPPET.format(extra=extra)],
+                             cwd=d, env=_env(mode), capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def time_to_healthy(mode: str, timeout: float = 120.0) -> float:
+    port = free_port()
+    with tempfile.TemporaryDirectory() as d:
+        t0 = time.perf_counter()
+        proc = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "webhook_fastapi:app",
+             "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+            cwd=d, env=_env(mode), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            while time.perf_counter() - t0 < timeout:
+                try:
+                    if requests.get(f"http://127.0.0.1:{port}/health", timeout=1).status_code == 200:
+                        return time.perf_counter() - t0
+                except requests.RequestException:
+                    pass
+                if proc.poll() is not None:
+                    raise RuntimeError(f"server exited with {proc.returncode}")
+                time.sleep(0.01)
+            raise RuntimeError("server never became healthy")
+        finally:
+            proc.terminate()
+            proc.wait(timeout=10)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--runs", type=int, default=5)
+    args = ap.parse_args()
+
+    for mode in ("eager", "background"):
+        imports = [import_time(mode) for _ in range(args.runs)]
+        healthy = [time_to_healthy(mode) for _ in range(args.runs)]
+        print(f"{mode:<11} import median={statistics.median(imports) * 1000:8.1f}ms   "
+              f"first /health median={statistics.median(healthy) * 1000:8.1f}ms   (runs={args.runs})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,421 @@
+# bot_dispatcher.py
+import csv, io, os, re, threading, time, uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+from zoneinfo import ZoneInfo
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+
+from create_bot import req_bot
+from job_state import JobDocs, Snapshot
+from metrics import span
+from rate_limit import TokenBucket
+from storage import invalid_project_name
+
+# Naive start times (CSV without an offset, ICS without TZID) are read as IST
+IST = ZoneInfo("Asia/Kolkata")
+
+# Dispatch state, so a restart (or another replica) resumes meetings that weren't sent yet
+DISPATCH_DIR = "dispatch_jobs"
+
+MAX_CONCURRENCY = int(os.getenv("DISPATCH_MAX_CONCURRENCY", "8"))
+RATE_PER_SEC    = float(os.getenv("DISPATCH_RATE_PER_SEC", "10"))
+MAX_RETRIES     = int(os.getenv("DISPATCH_MAX_RETRIES", "3"))
+# Bots are scheduled to join this many seconds before the meeting starts
+JOIN_LEAD_SEC   = int(os.getenv("DISPATCH_JOIN_LEAD_SEC", "60"))
+
+MEETING_URL_RE = re.compile(
+    r"https://(?:meet\.google\.com/[a-z0-9-]+|[\w.-]*zoom\.us/j/[^\s\"<>\\]+|teams\.microsoft\.com/[^\s\"<>\\]+|teams\.live\.com/[^\s\"<>\\]+)",
+    re.IGNORECASE,
+)
+
+_executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENCY, thread_name_prefix="bot-dispatch")
+_limiter  = TokenBucket(rate=RATE_PER_SEC, capacity=max(1.0, RATE_PER_SEC))
+_lock     = threading.Lock()
+_batches: Dict[str, Dict[str, Any]] = {}
+_docs     = JobDocs(DISPATCH_DIR)
+_stopping = threading.Event()  # set (under _lock) by stop_batches()
+
+
+def _session() -> requests.Session:
+    """Keep-alive pool sized to the worker count, shared by every dispatch thread."""
+    s = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=MAX_CONCURRENCY)
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
+    return s
+
+_http = _session()
+
+
+# ---------- input parsing ----------
+def parse_start(value: Optional[str]) -> Optional[datetime]:
+    """ISO 8601 start time -> aware datetime (naive values are IST). Empty -> None."""
+    value = (value or "").strip()
+    if not value:
+        return None
+    dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return dt if dt.tzinfo else dt.replace(tzinfo=IST)
+
+
+def parse_csv(text: str) -> List[Dict[str, Any]]:
+    """
+    CSV with a header row. Columns: meeting_url (required), project_name or
+    project, bot_name, start_time (ISO 8601). Unknown columns are ignored.
+    """
+    out = []
+    for row in csv.DictReader(io.StringIO(text)):
+        # Cells past the header land under the key None (as a list); drop them
+        row = {(k or "").strip().lower(): (v or "").strip() for k, v in row.items() if k is not None}
+        if not any(row.values()):
+            continue
+        out.append({
+            "meeting_url": row.get("meeting_url") or row.get("url") or "",
+            "project_name": row.get("project_name") or row.get("project") or "",
+            "bot_name": row.get("bot_name") or "",
+            "start_time": row.get("start_time") or row.get("start") or "",
+        })
+    return out
+
+
+def _ics_unfold(text: str) -> List[str]:
+    lines: List[str] = []
+    for raw in text.splitlines():
+        if raw[:1] in (" ", "\t") and lines:
+            lines[-1] += raw[1:]
+        else:
+            lines.append(raw)
+    return lines
+
+
+def _ics_datetime(params: str, value: str) -> Optional[str]:
+    value = value.strip()
+    if "VALUE=DATE" in params.upper() and "T" not in value:
+        return None  # all-day event: no start time to schedule against
+    dt = datetime.strptime(value.rstrip("Z"), "%Y%m%dT%H%M%S")
+    if value.endswith("Z"):
+        dt = dt.replace(tzinfo=timezone.utc)
+    else:
+        m = re.search(r"TZID=([^;:]+)", params)
+        try:
+            dt = dt.replace(tzinfo=ZoneInfo(m.group(1)) if m else IST)
+        except Exception:
+            dt = dt.replace(tzinfo=IST)
+    return dt.isoformat()
+
+
+def parse_ics(text: str) -> List[Dict[str, Any]]:
+    """
+    VEVENTs from an iCalendar file. The meeting link is taken from URL,
+    LOCATION, DESCRIPTION or any X- property (e.g. X-GOOGLE-CONFERENCE).
+    Events without a recognisable meeting link are skipped.
+    """
+    out: List[Dict[str, Any]] = []
+    event: Optional[Dict[str, Any]] = None
+    for line in _ics_unfold(text):
+        if line == "BEGIN:VEVENT":
+            event = {"start_time": "", "links": []}
+            continue
+        if line == "END:VEVENT":
+            if event and event["links"]:
+                out.append({"meeting_url": event["links"][0], "project_name": "",
+                            "bot_name": "", "start_time": event["start_time"]})
+            event = None
+            continue
+        if event is None or ":" not in line:
+            continue
+        head, _, value = line.partition(":")
+        name, _, params = head.partition(";")
+        name = name.upper()
+        if name == "DTSTART":
+            try:
+                event["start_time"] = _ics_datetime(params, value) or ""
+            except ValueError:
+                event["start_time"] = ""
+        elif name in ("URL", "LOCATION", "DESCRIPTION") or name.startswith("X-"):
+            event["links"].extend(MEETING_URL_RE.findall(value.replace("\\n", " ")))
+    return out
+
+
+def load_meetings(content: str, filename: str = "") -> List[Dict[str, Any]]:
+    """Parse an uploaded meeting list; .ics (or anything with BEGIN:VCALENDAR) is iCalendar, else CSV."""
+    if filename.lower().endswith(".ics") or content.lstrip().startswith("BEGIN:VCALENDAR"):
+        return parse_ics(content)
+    return parse_csv(content)
+
+
+# ---------- state ----------
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _snapshot(batch: Dict[str, Any]) -> Snapshot:
+    """Serialize batch state; call under _lock and _docs.write() the result after releasing it."""
+    batch["updated_at"] = _now()
+    return _docs.snapshot(batch["batch_id"], batch)
+
+
+def _view(batch: Dict[str, Any]) -> Dict[str, Any]:
+    counts: Dict[str, int] = {}
+    for m in batch["meetings"]:
+        counts[m["status"]] = counts.get(m["status"], 0) + 1
+    return {
+        "batch_id": batch["batch_id"],
+        "status": batch["status"],
+        "total": len(batch["meetings"]),
+        "counts": counts,
+        "created_at": batch.get("created_at"),
+        "updated_at": batch.get("updated_at"),
+        "meetings": [dict(m) for m in batch["meetings"]],
+    }
+
+
+def get_batch(batch_id: str) -> Optional[Dict[str, Any]]:
+    with _lock:
+        batch = _batches.get(batch_id)
+        if batch is not None:
+            return _view(batch)
+    batch = _docs.read(batch_id)  # finished, or running on another replica
+    return _view(batch) if batch else None
+
+
+def _update(batch_id: str, idx: int, **fields) -> None:
+    with _lock:
+        batch = _batches[batch_id]
+        batch["meetings"][idx].update(fields)
+        if batch["status"] == "running" and not any(
+            m["status"] in ("pending", "sending") for m in batch["meetings"]
+        ):
+            batch["status"] = "done"
+        snap = _snapshot(batch)
+    _docs.write(snap)
+
+
+# ---------- dispatch ----------
+def _join_at(start: Optional[datetime]) -> Optional[str]:
+    """When the bot should join: JOIN_LEAD_SEC before start, or None (join now) if that's past."""
+    if start is None:
+        return None
+    at = start - timedelta(seconds=JOIN_LEAD_SEC)
+    if at <= datetime.now(timezone.utc):
+        return None
+    return at.astimezone(timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def _retry_delay(resp: Optional[requests.Response], attempt: int) -> float:
+    if resp is not None:
+        try:
+            return float(resp.headers.get("Retry-After", ""))
+        except ValueError:
+            pass
+    return min(2 ** attempt, 30)
+
+
+def _never_sent(e: requests.RequestException) -> bool:
+    """
+    True if the request certainly didn't reach Recall (the connection was
+    never made), so sending it again can't create a second bot. A reset or
+    read timeout after the request went out may already have created one.
+    """
+    if isinstance(e, requests.ConnectTimeout):
+        return True
+    if isinstance(e, requests.ConnectionError):
+        return isinstance(getattr(e.args[0] if e.args else None, "reason", None), NewConnectionError)
+    return False
+
+
+# Outcomes where the bot may or may not exist; re-sending could add a duplicate bot
+UNCONFIRMED = "check Recall before retrying"
+
+
+def _send(batch_id: str, idx: int) -> None:
+    with _lock:
+        if _stopping.is_set():
+            return  # stays pending for whoever resumes the batch
+        m = dict(_batches[batch_id]["meetings"][idx])
+    join_at = m.get("join_at")
+    if join_at and parse_start(join_at) <= datetime.now(timezone.utc):
+        join_at = None  # resumed after its slot; Recall rejects join_at in the past
+    _update(batch_id, idx, status="sending", join_at=join_at)
+    for attempt in range(1, MAX_RETRIES + 1):
+        resp = None
+        try:
+            _limiter.acquire()
+            with span("dispatch_bot"):
+                bot = req_bot(m["meeting_url"], project_name=m["project_name"], bot_name=m["bot_name"],
+                              join_at=join_at, session=_http)
+            _update(batch_id, idx, status="created", bot_id=bot.get("id"), attempts=attempt, error=None)
+            return
+        except requests.HTTPError as e:
+            # Only a 429 is known not to have created anything; a 5xx may have
+            resp = e.response
+            retryable = resp is not None and resp.status_code == 429
+            err = f"{resp.status_code if resp is not None else '?'}: {resp.text[:300] if resp is not None else e}"
+            if resp is not None and resp.status_code >= 500:
+                err = f"{err} ({UNCONFIRMED})"
+        except requests.RequestException as e:
+            retryable, err = _never_sent(e), str(e)
+            if not retryable:
+                err = f"{err} ({UNCONFIRMED})"
+        except Exception as e:
+            retryable, err = False, str(e)
+        if not retryable or attempt == MAX_RETRIES:
+            print(f"[dispatch] {m['meeting_url']} failed:", err)
+            _update(batch_id, idx, status="failed", attempts=attempt, error=err)
+            return
+        if _stopping.wait(_retry_delay(resp, attempt)):
+            # Nothing reached Recall, so whoever resumes the batch can send it
+            _update(batch_id, idx, status="pending", attempts=attempt, error=err)
+            return
+
+
+FIELDS = ("meeting_url", "project_name", "bot_name", "start_time")
+
+
+def _normalize(m: Any, project: str, bot_name: str) -> Dict[str, Any]:
+    """One meeting entry -> dispatch item. A bare string is taken as the meeting_url."""
+    if isinstance(m, str):
+        m = {"meeting_url": m}
+    error = None
+    if not isinstance(m, dict):
+        error, m = f"expected an object or a meeting URL, got {type(m).__name__}", {}
+    bad = [k for k in FIELDS if m.get(k) is not None and not isinstance(m[k], str)]
+    if bad:
+        error = f"{', '.join(bad)} must be a string"
+        m = {k: v for k, v in m.items() if k not in bad}
+    url = (m.get("meeting_url") or "").strip()
+    item = {
+        "meeting_url": url,
+        "project_name": (m.get("project_name") or project or "default").strip(),
+        "bot_name": (m.get("bot_name") or bot_name or "SummarizerBot").strip(),
+        "start_time": (m.get("start_time") or "").strip() or None,
+        "join_at": None,
+        "status": "pending",
+        "bot_id": None,
+        "error": None,
+    }
+    if error:
+        item.update(status="invalid", error=error)
+        return item
+    if not url:
+        item.update(status="invalid", error="meeting_url is required")
+        return item
+    if invalid_project_name(item["project_name"]):
+        # It becomes a storage prefix once transcripts arrive
+        item.update(status="invalid", error=f"invalid project_name {item['project_name']!r}")
+        return item
+    try:
+        item["join_at"] = _join_at(parse_start(item["start_time"]))
+    except ValueError:
+        item.update(status="invalid", error=f"bad start_time {item['start_time']!r}")
+    return item
+
+
+def start_batch(meetings: List[Any], project: str = "default",
+                bot_name: str = "SummarizerBot") -> Dict[str, Any]:
+    """
+    Create bots for many meetings concurrently (bounded by DISPATCH_MAX_CONCURRENCY
+    and DISPATCH_RATE_PER_SEC). Meetings with a future start time get a
+    scheduled bot via Recall's join_at, so everything is sent right away.
+    """
+    batch = {
+        "batch_id": uuid.uuid4().hex[:12],
+        "status": "running",
+        "created_at": _now(),
+        "meetings": [_normalize(m, project, bot_name) for m in meetings],
+    }
+    with _lock:
+        if not any(m["status"] == "pending" for m in batch["meetings"]):
+            batch["status"] = "done"
+        _batches[batch["batch_id"]] = batch
+        snap = _snapshot(batch)
+        view = _view(batch)
+    _docs.write(snap)
+    _docs.start_heartbeat(_heartbeat)
+    for idx, m in enumerate(batch["meetings"]):
+        if m["status"] == "pending":
+            _executor.submit(_send, batch["batch_id"], idx)
+    print(f"[dispatch] batch {batch['batch_id']}: {len(batch['meetings'])} meetings")
+    return view
+
+
+def wait_batch(batch_id: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+    """Block until the batch has no pending meetings (or timeout) and return its state."""
+    deadline = None if timeout is None else time.time() + timeout
+    while True:
+        batch = get_batch(batch_id)
+        if batch is None or batch["status"] != "running":
+            return batch
+        if deadline is not None and time.time() >= deadline:
+            return batch
+        time.sleep(0.1)
+
+
+def resume_batches() -> int:
+    """
+    Re-send meetings that were never confirmed by a batch's owner before it
+    went away (this process before a restart, or a replica that died).
+    Batches another live replica is dispatching are left alone. Ones caught
+    mid-request ("sending") are marked failed rather than retried, since the
+    bot may already exist. Returns batches resumed.
+    """
+    _docs.start_heartbeat(_heartbeat)
+    with _lock:
+        if _stopping.is_set():
+            return 0
+        mine = set(_batches)
+    resumed = 0
+    for batch in _docs.claim_stale(skip=mine):
+        for m in batch["meetings"]:
+            if m["status"] == "sending":
+                m.update(status="failed", error=f"interrupted by restart; {UNCONFIRMED}")
+        pending = [i for i, m in enumerate(batch["meetings"]) if m["status"] == "pending"]
+        with _lock:
+            if _stopping.is_set() or batch["batch_id"] in _batches:
+                continue
+            if not pending:
+                batch["status"] = "done"
+            _batches[batch["batch_id"]] = batch
+            snap = _snapshot(batch)
+        _docs.write(snap)
+        for idx in pending:
+            _executor.submit(_send, batch["batch_id"], idx)
+        print(f"[dispatch] batch {batch['batch_id']}: resumed, {len(pending)} meetings to send")
+        resumed += 1
+    return resumed
+
+
+def _heartbeat() -> None:
+    """Refresh the lease on our running batches and adopt ones whose owner is gone."""
+    with _lock:
+        if _stopping.is_set():
+            return
+        snaps = [_snapshot(b) for b in _batches.values() if b["status"] == "running"]
+    for snap in snaps:
+        _docs.write(snap)
+    resume_batches()
+
+
+def stop_batches() -> int:
+    """
+    Shutdown: drop meetings not yet picked up (they stay pending), let
+    requests already in flight finish and record their bot, then release the
+    running batches so the next process (or another replica) resumes them at
+    once instead of waiting out the lease. Returns batches released.
+    """
+    with _lock:
+        _stopping.set()
+    _executor.shutdown(wait=True, cancel_futures=True)
+    with _lock:
+        running = [b for b in _batches.values() if b["status"] == "running"]
+    for batch in running:
+        try:
+            _docs.release(batch["batch_id"], batch)
+        except Exception as e:
+            print(f"[dispatch] batch {batch['batch_id']}: could not release:", e)
+    if running:
+        print(f"[dispatch] released {len(running)} running batch(es)")
+    return len(running)
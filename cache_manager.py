@@ -1,11 +1,18 @@
 # cache_manager.py
 import hashlib, json, time
-from pathlib import Path
 from datetime import datetime, timezone
 
-# Root cache folder
-CACHE_DIR = Path("summary_cache")
-CACHE_DIR.mkdir(exist_ok=True)
+from metrics import timed
+from storage import get_storage
+
+# Root cache prefix in the configured storage backend
+CACHE_DIR = "summary_cache"
+
+# Per-project index: one small object per cached entry, <project>/<key>.json,
+# so a project's summaries can be purged or re-keyed without scanning the whole
+# cache. Separate objects (not one shared file) so replicas never overwrite
+# each other's additions.
+INDEX_DIR = f"{CACHE_DIR}/_index"
 
 # Default retention for cached summaries
 RETENTION_DAYS = 15
@@ -24,6 +31,16 @@ def _cache_key(text: str, project: str | None = None, filename: str | None = Non
     return hashlib.sha1(base.encode("utf-8")).hexdigest()
 
 
+def _entry_key(key: str) -> str:
+    return f"{CACHE_DIR}/{key}.json"
+
+
+def summary_key(text: str, project: str | None = None, filename: str | None = None) -> str:
+    """Storage key the cached summary for this text would live at (it may not exist)."""
+    return _entry_key(_cache_key(text, project=project, filename=filename))
+
+
+@timed("cache_get")
 def get_summary(
     text: str,
     project: str | None = None,
@@ -34,62 +51,157 @@ def get_summary(
     Return cached summary if present and not expired.
     Backwards compatible: calling with only (text) still works.
     """
-    key = _cache_key(text, project=project, filename=filename)
-    f = CACHE_DIR / f"{key}.json"
-    if not f.exists():
+    store = get_storage()
+    f = summary_key(text, project=project, filename=filename)
+    info = store.stat(f)
+    if info is None:
         return None
 
     cutoff = time.time() - (retention_days * 24 * 3600)
-    if f.stat().st_mtime < cutoff:
+    if info.mtime < cutoff:
         try:
-            f.unlink()
+            store.delete(f)
         except Exception:
             pass
         return None
 
     try:
-        data = json.loads(f.read_text(encoding="utf-8"))
+        data = json.loads(store.read_text(f))
         return data.get("summary")
+    except FileNotFoundError:
+        return None  # expired/purged between stat and read
     except Exception:
         # Corrupt cache → remove and miss
         try:
-            f.unlink()
+            store.delete(f)
         except Exception:
             pass
         return None
 
 
+def _index_prefix(project: str) -> str:
+    return f"{INDEX_DIR}/{project}"
+
+
+def _index_keys(project: str) -> list[str]:
+    """Cache keys indexed under `project`."""
+    return sorted(o.name[:-len(".json")] for o in get_storage().list(_index_prefix(project), recursive=False)
+                  if o.name.endswith(".json"))
+
+
+def _index_add(project: str, filename: str | None, key: str) -> None:
+    get_storage().put_text(f"{_index_prefix(project)}/{key}.json",
+                           json.dumps({"filename": filename}, ensure_ascii=False))
+
+
+@timed("cache_save")
 def save_summary(
     text: str,
     summary,
     project: str | None = None,
     filename: str | None = None,
+    scoped: bool = True,
 ) -> str:
     """
     Save (or update) a cached summary. Backwards compatible with text-only.
     Forces summary to string to avoid JSON serialization errors.
+    With scoped=False the key stays text-only (what get_summary(text) reads)
+    while project/filename are still recorded and indexed for purge/rename.
     """
-    key = _cache_key(text, project=project, filename=filename)
-    f = CACHE_DIR / f"{key}.json"
+    if scoped:
+        key = _cache_key(text, project=project, filename=filename)
+    else:
+        key = _cache_key(text)
+    f = _entry_key(key)
     obj = {
         "summary": str(summary),
         "created_at": datetime.now(timezone.utc).isoformat(),
         "project": project,
         "filename": filename,
     }
-    f.write_text(json.dumps(obj, ensure_ascii=False, indent=2), encoding="utf-8")
-    return str(f)
+    store = get_storage()
+    store.put_text(f, json.dumps(obj, ensure_ascii=False, indent=2))
+    if project:
+        _index_add(project, filename, key)
+    return store.location(f)
 
 
 def cleanup_cache(retention_days: int = RETENTION_DAYS) -> int:
-    """Delete cache files older than retention_days. Returns number deleted."""
+    """Delete cache files (and index entries) older than retention_days. Returns cache files deleted."""
     cutoff = time.time() - (retention_days * 24 * 3600)
-    deleted = 0
-    for f in CACHE_DIR.glob("*.json"):
+    store = get_storage()
+    expired = [o.key for o in store.list(CACHE_DIR, recursive=False)
+               if o.key.endswith(".json") and o.mtime < cutoff]
+    try:
+        # An index entry is written with its cache file, so it expires with it
+        store.delete_many([o.key for o in store.list(INDEX_DIR) if o.mtime < cutoff])
+        return store.delete_many(expired)
+    except Exception as e:
+        print("[cache] cleanup failed:", e)
+        return 0
+
+
+def _owned_by(key: str, project: str) -> bool:
+    """
+    True if the entry was last saved for `project`. Unscoped (text-only) keys
+    are shared: another project with the same transcript text may own it now.
+    """
+    try:
+        return json.loads(get_storage().read_text(_entry_key(key))).get("project") == project
+    except FileNotFoundError:
+        return False
+    except Exception:
+        return True  # corrupt; get_summary would drop it anyway
+
+
+def purge_project(project: str) -> int:
+    """
+    Delete the cached summaries indexed under `project` that still belong to
+    it, plus the index. Returns files deleted.
+    """
+    store = get_storage()
+    try:
+        keys = _index_keys(project)
+        owned = [_entry_key(k) for k in keys if _owned_by(k, project)]
+        # Only the entries listed: a summary saved meanwhile stays indexed
+        store.delete_many([f"{_index_prefix(project)}/{k}.json" for k in keys])
+        return store.delete_many(owned)
+    except Exception as e:
+        print(f"[cache] could not purge {project}:", e)
+        return 0
+
+
+def rename_project_index(old: str, new: str) -> list[str]:
+    """Move `old`'s index entries to `new` (merging if needed). Returns the keys that moved."""
+    store = get_storage()
+    keys = _index_keys(old)
+    for key in keys:
+        # Entry by entry: `new` may already have entries of its own
+        src = f"{_index_prefix(old)}/{key}.json"
         try:
-            if f.stat().st_mtime < cutoff:
-                f.unlink()
-                deleted += 1
-        except Exception:
+            store.put_bytes(f"{_index_prefix(new)}/{key}.json", store.read_bytes(src))
+        except FileNotFoundError:
+            continue
+        store.delete(src)
+    return keys
+
+
+def rekey_entries(keys: list[str], project: str) -> int:
+    """
+    Point cached entries at their new project. Rewriting an entry restarts
+    its retention. Returns entries updated.
+    """
+    store = get_storage()
+    updated = 0
+    for key in keys:
+        f = _entry_key(key)
+        try:
+            obj = json.loads(store.read_text(f))
+            obj["project"] = project
+            store.put_text(f, json.dumps(obj, ensure_ascii=False, indent=2))
+            updated += 1
+        except FileNotFoundError:
             pass
-    return deleted
\ No newline at end of file
+        except Exception as e:
+            print(f"[cache] could not re-key {key}:", e)
+    return updated
@@ -6,14 +6,23 @@ API_KEY = os.getenv("RECALLAI_API_KEY")
 REGION  = os.getenv("RECALLAI_REGION", "us-west-2")
 assert API_KEY, "Set RECALLAI_API_KEY in .env"
 
-BASE = f"https://{REGION}.recall.ai/api/v1"
+# RECALLAI_BASE_URL lets benchmarks point at a local stand-in server
+BASE = os.getenv("RECALLAI_BASE_URL") or f"https://{REGION}.recall.ai/api/v1"
 HDRS = {"Authorization": f"Token {API_KEY}", "Content-Type": "application/json"}
 
-def req_bot(meet_url: str, project_name: str, bot_name: str = "Pixabot") -> dict:
+def req_bot(
+    meet_url: str,
+    project_name: str,
+    bot_name: str = "Pixabot",
+    join_at: str | None = None,
+    session: requests.Session | None = None,
+) -> dict:
     """
     Request a Recall bot to join the meeting.
     We embed `project_name` into bot.metadata so the webhook can save
     the transcript into transcripts_projects/<project_name>/transcripts/.
+    `join_at` (ISO 8601) schedules the bot instead of joining right away;
+    pass a pooled `session` when creating many bots.
     """
     payload = {
         "meeting_url": meet_url,
@@ -24,16 +33,39 @@ def req_bot(meet_url: str, project_name: str, bot_name: str = "Pixabot") -> dict
         },
         "start_recording_on": "participant_join",
     }
-    r = requests.post(f"{BASE}/bot/", headers=HDRS, data=json.dumps(payload), timeout=30)
+    if join_at:
+        payload["join_at"] = join_at
+    r = (session or requests).post(f"{BASE}/bot/", headers=HDRS, data=json.dumps(payload), timeout=30)
     r.raise_for_status()
     return r.json()
 
 def main():
-    """CLI entrypoint: python create_bot.py <google_meet_url> <project_name> [bot_name]"""
+    """
+    CLI entrypoint:
+        python create_bot.py <google_meet_url> <project_name> [bot_name]
+        python create_bot.py --batch <meetings.csv|.ics> <project_name> [bot_name]
+    """
     if len(sys.argv) < 3:
         print("Usage: python create_bot.py <google_meet_url> <project_name> [bot_name]")
+        print("       python create_bot.py --batch <meetings.csv|.ics> <project_name> [bot_name]")
         sys.exit(2)
 
+    if sys.argv[1] == "--batch":
+        from bot_dispatcher import load_meetings, start_batch, wait_batch
+        if len(sys.argv) < 4:
+            print("Usage: python create_bot.py --batch <meetings.csv|.ics> <project_name> [bot_name]")
+            sys.exit(2)
+        path = sys.argv[2]
+        with open(path, encoding="utf-8") as f:
+            meetings = load_meetings(f.read(), filename=path)
+        batch = start_batch(meetings, project=sys.argv[3],
+                            bot_name=sys.argv[4] if len(sys.argv) > 4 else "Pixabot")
+        batch = wait_batch(batch["batch_id"])
+        for m in batch["meetings"]:
+            print(f"{m['status']:<8} {m.get('bot_id') or '-':<38} {m.get('join_at') or 'now':<27} "
+                  f"{m['meeting_url']} {m.get('error') or ''}")
+        sys.exit(0 if batch["counts"].get("failed", 0) == 0 else 1)
+
     meet_url = sys.argv[1]
     project  = sys.argv[2]
     bot_name = sys.argv[3] if len(sys.argv) > 3 else "Pixabot"
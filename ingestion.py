@@ -0,0 +1,463 @@
+# ingestion.py
+import asyncio, json, multiprocessing, os, re, time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+from job_state import HEARTBEAT_SEC, INSTANCE_ID, JobDocs
+from metrics import INGEST_EVENTS, STAGE_SECONDS, span, trace_id_var
+from normalize import parse_download
+from storage import get_storage, invalid_project_name
+
+# Webhooks waiting for a fetch worker; past this the webhook answers 503 + Retry-After
+QUEUE_SIZE      = int(os.getenv("INGEST_QUEUE_SIZE", "256"))
+# Concurrent bot lookups / polls / downloads (coroutines, so these are cheap)
+FETCH_WORKERS   = int(os.getenv("INGEST_FETCH_WORKERS", "64"))
+# Processes parsing + normalizing downloads; 0 parses in a thread instead
+PROCESS_WORKERS = int(os.getenv("INGEST_PROCESS_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Threads writing finished transcripts to storage
+WRITE_WORKERS   = int(os.getenv("INGEST_WRITE_WORKERS", "4"))
+RETRY_AFTER_SEC = int(os.getenv("INGEST_RETRY_AFTER_SEC", "30"))
+# Retries (with backoff) for Recall lookups / downloads that fail transiently
+FETCH_RETRIES   = int(os.getenv("INGEST_FETCH_RETRIES", "4"))
+# On shutdown, keep working on accepted webhooks for up to this long
+DRAIN_SEC       = float(os.getenv("INGEST_DRAIN_SEC", "20"))
+
+# Accepted webhooks are stored before the 202 and removed once written:
+#   ingest_jobs/pending/<instance>/<id>.json  accepted, not yet ingested
+#   ingest_jobs/failed/<id>.json              gave up (reason inside); replay by hand
+#   ingest_jobs/owners/<instance>.json        heartbeat; a replica whose heartbeat
+#                                             stops has its pending jobs taken over
+JOBS_DIR = "ingest_jobs"
+
+# Polling for transcripts that aren't ready when the webhook arrives
+MAX_WAIT_SEC   = 300
+POLL_START_SEC = 2
+POLL_MAX_SEC   = 15
+
+
+class IngestQueueFull(Exception):
+    """The pipeline is saturated; the webhook should answer 503 so Recall retries later."""
+
+
+@dataclass
+class IngestJob:
+    id: str  # ours (uuid hex); used in storage keys, so never client-supplied
+    project: Optional[str]
+    bot_id: Optional[str] = None
+    transcript_id: Optional[str] = None
+    download_url: Optional[str] = None
+    trace_id: Optional[str] = None  # the webhook request's, for logs and metrics only
+    received: float = field(default_factory=time.perf_counter, compare=False)
+    # Wall-clock arrival, kept across replays so a re-written transcript keeps its name
+    received_at: str = field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+
+    @property
+    def tag(self) -> str:
+        """Short id for the transcript's file name: Recall's transcript or bot id, else ours."""
+        for value in (self.transcript_id, self.bot_id, self.id):
+            tag = re.sub(r"[^A-Za-z0-9]", "", value or "")[:12]
+            if tag:
+                return tag
+        return "unknown"
+
+    def to_doc(self) -> Dict[str, Any]:
+        doc = asdict(self)
+        del doc["received"]  # perf_counter; meaningless in another process
+        return doc
+
+    @classmethod
+    def from_doc(cls, doc: Dict[str, Any]) -> "IngestJob":
+        return cls(id=doc["id"], project=doc.get("project"), bot_id=doc.get("bot_id"),
+                   transcript_id=doc.get("transcript_id"), download_url=doc.get("download_url"),
+                   trace_id=doc.get("trace_id"),
+                   **({"received_at": doc["received_at"]} if doc.get("received_at") else {}))
+
+
+def _pending_key(job_id: str, instance: str = INSTANCE_ID) -> str:
+    return f"{JOBS_DIR}/pending/{instance}/{job_id}.json"
+
+
+def _transient(e: Exception) -> bool:
+    if isinstance(e, httpx.HTTPStatusError):
+        return e.response.status_code == 429 or e.response.status_code >= 500
+    return isinstance(e, httpx.TransportError)
+
+
+def _backoff(e: Exception, attempt: int) -> float:
+    if isinstance(e, httpx.HTTPStatusError):
+        try:
+            return min(float(e.response.headers.get("Retry-After", "")), 60.0)
+        except ValueError:
+            pass
+    return float(min(2 ** attempt, 30))
+
+
+class IngestionPipeline:
+    """
+    webhook -> [events] -> fetch: resolve project, poll, download (asyncio + httpx)
+            -> [downloads] -> parse: normalize, plaintext, sidecar (process pool)
+            -> [parsed] -> write: storage puts (threads)
+
+    Every queue is bounded, so a slow stage backs up into the one before it
+    and finally into submit(), which rejects instead of buffering without limit.
+    `write(project, body, segments_jsonl, tag, at) -> location` stores one transcript
+    (`at` is when the webhook arrived).
+
+    Delivery is at-least-once: submit() stores the job before the webhook is
+    acknowledged and it is only removed once written (or moved to failed/).
+    Jobs a stopped or crashed replica left behind are taken over by the
+    next heartbeat of a live one, so a transcript may occasionally be
+    written twice but is not lost.
+    """
+
+    def __init__(
+        self,
+        write: Callable[[str, str, bytes, str, datetime], str],
+        recall_base: str,
+        recall_headers: Dict[str, str],
+        fetch_workers: int = FETCH_WORKERS,
+        process_workers: int = PROCESS_WORKERS,
+        write_workers: int = WRITE_WORKERS,
+        queue_size: int = QUEUE_SIZE,
+    ):
+        self.write = write
+        self.recall_base = recall_base
+        self.recall_headers = recall_headers
+        self.fetch_workers = max(1, fetch_workers)
+        self.process_workers = max(0, process_workers)
+        self.write_workers = max(1, write_workers)
+        self.queue_size = max(1, queue_size)
+        self.counts = {k: 0 for k in ("received", "rejected", "replayed", "retried",
+                                      "ingested", "not_ready", "failed")}
+        self._owners = JobDocs(f"{JOBS_DIR}/owners")
+        self._owner_doc = {"status": "running", "instance": INSTANCE_ID}
+        self._accepting = False
+        self._in_flight = 0  # accepted or replayed, not yet ingested/failed
+        self._idle: Optional[asyncio.Event] = None
+        self._tasks: List[asyncio.Task] = []
+        self._housekeeping: Optional[asyncio.Task] = None
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._http: Optional[httpx.AsyncClient] = None
+        self._events: Optional[asyncio.Queue] = None
+        self._adopted: Optional[asyncio.Queue] = None  # taken over, waiting for room in _events
+
+    # ---------- lifecycle ----------
+    def _new_pool(self) -> ProcessPoolExecutor:
+        # spawn, not fork: the server process has an event loop and live threads
+        pool = ProcessPoolExecutor(max_workers=self.process_workers,
+                                   mp_context=multiprocessing.get_context("spawn"))
+        # Start the workers now rather than on the first burst
+        for _ in range(self.process_workers):
+            pool.submit(parse_download, b"[]")
+        return pool
+
+    async def start(self) -> None:
+        parse_slots = max(1, self.process_workers)
+        self._events = asyncio.Queue(self.queue_size)
+        self._adopted = asyncio.Queue()  # unbounded: these are already stored, and the heartbeat must never wait
+        self._downloads: asyncio.Queue = asyncio.Queue(2 * parse_slots)
+        self._parsed: asyncio.Queue = asyncio.Queue(2 * self.write_workers)
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._http = httpx.AsyncClient(timeout=30, limits=httpx.Limits(max_connections=self.fetch_workers))
+        if self.process_workers:
+            self._pool = self._new_pool()
+        self._tasks = (
+            [asyncio.create_task(self._fetch_worker()) for _ in range(self.fetch_workers)]
+            + [asyncio.create_task(self._parse_worker()) for _ in range(parse_slots)]
+            + [asyncio.create_task(self._write_worker()) for _ in range(self.write_workers)]
+            + [asyncio.create_task(self._replay_worker())]
+        )
+        self._housekeeping = asyncio.create_task(self._heartbeat())
+        self._accepting = True
+        print(f"[ingest] started: {self.fetch_workers} fetchers, {self.process_workers} parse processes, "
+              f"{self.write_workers} writers, queue {self.queue_size}")
+
+    async def stop(self) -> None:
+        """Stop accepting, finish what's in flight for up to DRAIN_SEC, then hand the rest over."""
+        self._accepting = False
+        if self._in_flight:
+            print(f"[ingest] draining {self._in_flight} webhook(s) (up to {DRAIN_SEC:.0f}s)")
+            try:
+                await asyncio.wait_for(self._idle.wait(), DRAIN_SEC)
+            except asyncio.TimeoutError:
+                pass
+        for t in self._tasks + [self._housekeeping]:
+            t.cancel()
+        await asyncio.gather(*self._tasks, self._housekeeping, return_exceptions=True)
+        self._tasks = []
+        if self._in_flight:
+            print(f"[ingest] stopping with {self._in_flight} webhook(s) not yet ingested; "
+                  "they stay in storage for another replica (or the next start)")
+        await self._http.aclose()
+        if self._pool:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+        try:
+            await asyncio.to_thread(self._retire)
+        except Exception as e:
+            print("[ingest] could not release pending jobs:", e)
+
+    # ---------- job documents (blocking; run in threads) ----------
+    def _save(self, job: IngestJob) -> None:
+        get_storage().put_text(_pending_key(job.id), json.dumps(job.to_doc(), ensure_ascii=False))
+
+    def _forget(self, job: IngestJob) -> None:
+        get_storage().delete(_pending_key(job.id))
+
+    def _dead_letter(self, job: IngestJob, reason: str) -> None:
+        doc = {**job.to_doc(), "reason": reason}
+        store = get_storage()
+        store.put_text(f"{JOBS_DIR}/failed/{job.id}.json", json.dumps(doc, ensure_ascii=False, indent=2))
+        store.delete(_pending_key(job.id))
+
+    def _beat(self) -> List[IngestJob]:
+        """Refresh our heartbeat and take over the pending jobs of replicas whose heartbeat stopped."""
+        self._owners.write(self._owners.snapshot(INSTANCE_ID, self._owner_doc))
+        store = get_storage()
+        adopted: List[IngestJob] = []
+        for orphan in self._owners.claim_stale(skip={INSTANCE_ID}):
+            instance = orphan.get("instance")
+            for o in list(store.list(f"{JOBS_DIR}/pending/{instance}", recursive=False)):
+                try:
+                    job = IngestJob.from_doc(json.loads(store.read_text(o.key)))
+                except FileNotFoundError:
+                    continue
+                except Exception as e:
+                    print(f"[ingest] unreadable job {o.key}:", e)
+                    continue
+                self._save(job)
+                store.delete(o.key)
+                adopted.append(job)
+            self._owners.delete(instance)
+            print(f"[ingest] took over {len(adopted)} pending webhook(s) from {instance}")
+        return adopted
+
+    def _retire(self) -> None:
+        """Shutdown: drop our heartbeat, or release it at once if jobs are left for others to take."""
+        if any(True for _ in get_storage().list(f"{JOBS_DIR}/pending/{INSTANCE_ID}", recursive=False)):
+            self._owners.release(INSTANCE_ID, self._owner_doc)
+        else:
+            self._owners.delete(INSTANCE_ID)
+
+    async def _heartbeat(self) -> None:
+        while True:
+            try:
+                adopted = await asyncio.to_thread(self._beat)
+            except Exception as e:
+                print("[ingest] heartbeat failed:", e)
+                adopted = []
+            for job in adopted:
+                self._track(1)
+                self._count("replayed")
+                self._adopted.put_nowait(job)
+            await asyncio.sleep(HEARTBEAT_SEC)
+
+    async def _replay_worker(self) -> None:
+        """Feed taken-over jobs into the pipeline as it has room, off the heartbeat's path."""
+        while True:
+            job = await self._adopted.get()
+            await self._events.put(job)  # waits while the pipeline is full
+
+    # ---------- intake ----------
+    async def submit(self, job: IngestJob) -> None:
+        """
+        Store the job and queue it, without waiting for it to be processed.
+        Raises IngestQueueFull when saturated (or shutting down); the job is
+        then not stored and the webhook should be retried by the sender.
+        """
+        if self._events is None:
+            raise RuntimeError("ingestion pipeline not started")
+        if not self._accepting or self._events.full():
+            self._count("rejected")
+            raise IngestQueueFull(f"ingestion queue full ({self.queue_size})")
+        await asyncio.to_thread(self._save, job)
+        try:
+            self._events.put_nowait(job)
+        except asyncio.QueueFull:
+            await asyncio.to_thread(self._forget, job)
+            self._count("rejected")
+            raise IngestQueueFull(f"ingestion queue full ({self.queue_size})") from None
+        self._track(1)
+        self._count("received")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.counts,
+            "in_flight": self._in_flight,
+            "queued": self._events.qsize() if self._events else 0,
+            "awaiting_replay": self._adopted.qsize() if self._events else 0,
+            "awaiting_parse": self._downloads.qsize() if self._events else 0,
+            "awaiting_write": self._parsed.qsize() if self._events else 0,
+            "accepting": self._accepting,
+            "queue_size": self.queue_size,
+            "fetch_workers": self.fetch_workers,
+            "process_workers": self.process_workers,
+            "write_workers": self.write_workers,
+        }
+
+    def _track(self, delta: int) -> None:
+        self._in_flight += delta
+        if self._in_flight:
+            self._idle.clear()
+        else:
+            self._idle.set()
+
+    async def _finish(self, job: IngestJob, outcome: str, reason: Optional[str] = None) -> None:
+        """A job reached its end: forget it (ingested) or move it to failed/."""
+        try:
+            if outcome == "ingested":
+                await asyncio.to_thread(self._forget, job)
+            else:
+                await asyncio.to_thread(self._dead_letter, job, reason or outcome)
+        except Exception as e:
+            print(f"[ingest] {job.id}: could not update job state:", e)
+        self._count(outcome)
+        self._track(-1)
+
+    def _count(self, outcome: str) -> None:
+        self.counts[outcome] += 1
+        INGEST_EVENTS.inc(outcome=outcome)
+
+    # ---------- Recall API ----------
+    async def _recall_get(self, path: str) -> Dict[str, Any]:
+        r = await self._http.get(f"{self.recall_base}{path}", headers=self.recall_headers)
+        r.raise_for_status()
+        return r.json() or {}
+
+    async def _resolve_project(self, bot_id: Optional[str]) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """
+        (bot.metadata.project or "default", the bot) - the bot is handed on so
+        the first transcript lookup doesn't fetch it again.
+        """
+        if not bot_id:
+            return "default", None
+        try:
+            info = await self._recall_get(f"/bot/{bot_id}/")
+        except Exception as e:
+            print("[webhook] could not fetch bot metadata:", e)
+            return "default", None
+        p = (info.get("metadata") or {}).get("project")
+        p = p.strip() if isinstance(p, str) else ""
+        if p and invalid_project_name(p):
+            print(f"[webhook] bot {bot_id} has an invalid project {p!r}; using default")
+            p = ""
+        return p or "default", info
+
+    async def _find_url(self, bot_id: Optional[str], transcript_id: Optional[str],
+                        bot_info: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        if transcript_id:
+            obj = await self._recall_get(f"/transcript/{transcript_id}/")
+            data = obj.get("data")
+            url = data.get("download_url") if isinstance(data, dict) else obj.get("download_url")
+            if url:
+                return url
+        if bot_id:
+            info = bot_info or await self._recall_get(f"/bot/{bot_id}/")
+            media = (info.get("recordings") or {}).get("media_shortcuts") or {}
+            t = (media.get("transcript") or {}).get("data", {})
+            if t.get("download_url"):
+                return t["download_url"]
+        return None
+
+    async def _wait_for_url(self, bot_id: Optional[str], transcript_id: Optional[str],
+                            bot_info: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        # Without an API key (no auth header) there is nothing to poll
+        if not (self.recall_headers and (bot_id or transcript_id)):
+            return None
+        with span("wait_for_transcript_url"):
+            deadline = time.time() + MAX_WAIT_SEC
+            delay = POLL_START_SEC
+            url = await self._find_url(bot_id, transcript_id, bot_info)
+            while not url and time.time() < deadline:
+                await asyncio.sleep(delay)
+                delay = min(int(delay * 1.5) or 1, POLL_MAX_SEC)
+                url = await self._find_url(bot_id, transcript_id)
+            return url
+
+    # ---------- stages ----------
+    async def _fetch(self, job: IngestJob) -> Optional[Tuple[IngestJob, str, bytes]]:
+        project, bot_info = job.project, None
+        if not project or project == "default":
+            project, bot_info = await self._resolve_project(job.bot_id)
+        url = job.download_url or await self._wait_for_url(job.bot_id, job.transcript_id, bot_info)
+        if not url:
+            return None
+        with span("download"):
+            r = await self._http.get(url, timeout=120)
+            r.raise_for_status()
+        return job, project, r.content
+
+    async def _fetch_worker(self) -> None:
+        while True:
+            job = await self._events.get()
+            token = trace_id_var.set(job.trace_id or job.id)
+            try:
+                for attempt in range(1, FETCH_RETRIES + 2):
+                    try:
+                        fetched = await self._fetch(job)
+                        break
+                    except Exception as e:
+                        if attempt > FETCH_RETRIES or not _transient(e):
+                            raise
+                        delay = _backoff(e, attempt)
+                        why = e.response.status_code if isinstance(e, httpx.HTTPStatusError) else type(e).__name__
+                        print(f"[ingest] {job.id}: fetch failed ({why}); retry {attempt} in {delay:.0f}s")
+                        self._count("retried")
+                        await asyncio.sleep(delay)
+                if fetched is None:
+                    print(f"[ingest] {job.id}: transcript not ready")
+                    await self._finish(job, "not_ready", f"no transcript URL after {MAX_WAIT_SEC}s")
+                else:
+                    await self._downloads.put(fetched)  # waits while parsing is behind
+            except Exception as e:
+                print(f"[ingest] {job.id}: fetch failed:", e)
+                await self._finish(job, "failed", f"fetch: {e}")
+            finally:
+                trace_id_var.reset(token)
+
+    async def _parse_worker(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            job, project, raw = await self._downloads.get()
+            token = trace_id_var.set(job.trace_id or job.id)
+            pool = self._pool
+            try:
+                with span("normalize_segments"):
+                    if pool is None:
+                        body, segments = await asyncio.to_thread(parse_download, raw)
+                    else:
+                        body, segments = await loop.run_in_executor(pool, parse_download, raw)
+                del raw
+                await self._parsed.put((job, project, body, segments))  # waits while writes are behind
+            except BrokenProcessPool as e:
+                # A worker died (e.g. OOM on a huge payload); replace the pool once
+                print(f"[ingest] {job.id}: parse pool broke, restarting it:", e)
+                await self._finish(job, "failed", f"parse: worker died ({e})")
+                if self._pool is pool:
+                    self._pool = self._new_pool()
+                    pool.shutdown(wait=False, cancel_futures=True)
+            except Exception as e:
+                print(f"[ingest] {job.id}: parse failed:", e)
+                await self._finish(job, "failed", f"parse: {e}")
+            finally:
+                trace_id_var.reset(token)
+
+    async def _write_worker(self) -> None:
+        while True:
+            job, project, body, segments = await self._parsed.get()
+            token = trace_id_var.set(job.trace_id or job.id)
+            try:
+                await asyncio.to_thread(self.write, project, body, segments, job.tag,
+                                        datetime.fromisoformat(job.received_at))
+                STAGE_SECONDS.observe(time.perf_counter() - job.received, stage="ingest_total")
+                await self._finish(job, "ingested")
+            except Exception as e:
+                print(f"[ingest] {job.id}: write failed:", e)
+                await self._finish(job, "failed", f"write: {e}")
+            finally:
+                trace_id_var.reset(token)
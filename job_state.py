@@ -0,0 +1,158 @@
+# job_state.py
+import itertools, json, os, socket, threading, time, uuid
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from storage import get_storage
+
+# Job state documents (batch_jobs/, dispatch_jobs/) live in shared storage, so
+# several replicas can see the same ones. Each running document names the
+# replica that owns it and carries a heartbeat; only documents whose owner
+# stopped heartbeating (crashed, redeployed) are taken over by another replica.
+INSTANCE_ID      = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+LEASE_SEC        = float(os.getenv("JOB_LEASE_SEC", "90"))
+HEARTBEAT_SEC    = max(1.0, LEASE_SEC / 3)
+# After claiming a stale document, wait this long and re-read it; if another
+# replica claimed it too, the last writer keeps it and the others back off
+CLAIM_SETTLE_SEC = float(os.getenv("JOB_CLAIM_SETTLE_SEC", "2"))
+
+Snapshot = Tuple[str, int, str]  # (key, seq, serialized document)
+
+
+def is_live(doc: Dict[str, Any]) -> bool:
+    """Owned by a replica that heartbeated within the lease."""
+    return bool(doc.get("owner")) and time.time() - float(doc.get("heartbeat") or 0) < LEASE_SEC
+
+
+class JobDocs:
+    """
+    The state documents under one prefix, one per job: <prefix>/<name>.json.
+
+    Callers keep their jobs in memory under their own lock, take a
+    snapshot() there, and write() it after releasing the lock, so storage
+    round trips never block other jobs. Writes of one document are applied
+    in snapshot order: a stale snapshot never overwrites a newer one or
+    brings back a deleted document.
+    """
+
+    def __init__(self, prefix: str):
+        self.prefix = prefix
+        self._guard = threading.Lock()
+        self._locks: Dict[str, threading.Lock] = {}
+        self._seq = itertools.count(1)
+        self._written: Dict[str, int] = {}  # key -> seq of the last snapshot stored (or deleted)
+        self._settled: Dict[str, str] = {}  # key -> etag of a finished document (not re-read)
+        self._heartbeat: Optional[threading.Thread] = None
+
+    def key(self, name: str) -> str:
+        return f"{self.prefix}/{name}.json"
+
+    def _cancel_key(self, name: str) -> str:
+        return f"{self.prefix}/{name}.cancel"
+
+    # ---------- documents ----------
+    def snapshot(self, name: str, doc: Dict[str, Any]) -> Snapshot:
+        """Stamp owner + heartbeat and serialize. Call while holding the lock that guards `doc`."""
+        doc["owner"] = INSTANCE_ID
+        doc["heartbeat"] = time.time()
+        with self._guard:
+            seq = next(self._seq)
+        return self.key(name), seq, json.dumps(doc, ensure_ascii=False, indent=2)
+
+    def _lock_for(self, key: str) -> threading.Lock:
+        with self._guard:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def write(self, snap: Snapshot) -> None:
+        key, seq, text = snap
+        with self._lock_for(key):
+            if seq <= self._written.get(key, 0):
+                return  # a newer snapshot is already stored
+            get_storage().put_text(key, text)
+            self._written[key] = seq
+
+    def read(self, name: str) -> Optional[Dict[str, Any]]:
+        try:
+            return json.loads(get_storage().read_text(self.key(name)))
+        except Exception:
+            return None
+
+    def release(self, name: str, doc: Dict[str, Any]) -> None:
+        """Give the document up now, so another replica can take it over without waiting out the lease."""
+        doc["owner"], doc["heartbeat"] = None, 0
+        with self._guard:
+            seq = next(self._seq)
+        self.write((self.key(name), seq, json.dumps(doc, ensure_ascii=False, indent=2)))
+
+    def delete(self, name: str) -> None:
+        """Delete the document; snapshots taken before this call are not written afterwards."""
+        key = self.key(name)
+        with self._lock_for(key):
+            with self._guard:
+                self._written[key] = next(self._seq)
+            get_storage().delete(key)
+
+    # ---------- cross-replica cancel ----------
+    def request_cancel(self, name: str) -> None:
+        """Ask the owning replica to drop the job; it checks on its next heartbeat."""
+        get_storage().put_text(self._cancel_key(name), INSTANCE_ID)
+
+    def cancel_requested(self, name: str) -> bool:
+        return get_storage().exists(self._cancel_key(name))
+
+    def clear_cancel(self, name: str) -> None:
+        get_storage().delete(self._cancel_key(name))
+
+    # ---------- takeover ----------
+    def claim_stale(self, skip: Set[str]) -> List[Dict[str, Any]]:
+        """
+        Take over running documents whose owner's lease expired (or that
+        predate ownership). Names in `skip` (already running here) are left
+        alone. Returns the documents this replica now owns.
+        """
+        store = get_storage()
+        claims: List[Tuple[str, str, Dict[str, Any]]] = []
+        for o in store.list(self.prefix, recursive=False):
+            name = o.name[:-len(".json")] if o.name.endswith(".json") else None
+            if name is None or name in skip or self._settled.get(o.key) == o.etag:
+                continue
+            try:
+                doc = json.loads(store.read_text(o.key))
+            except Exception:
+                continue
+            if doc.get("status") != "running":
+                self._settled[o.key] = o.etag
+                continue
+            if is_live(doc):
+                continue
+            token = uuid.uuid4().hex
+            doc["claim"] = token
+            self.write(self.snapshot(name, doc))
+            claims.append((name, token, doc))
+        if not claims:
+            return []
+        time.sleep(CLAIM_SETTLE_SEC)
+        won = []
+        for name, token, doc in claims:
+            current = self.read(name)
+            if current and current.get("claim") == token:
+                won.append(doc)
+            else:
+                print(f"[jobs] {self.key(name)} was claimed by another replica")
+        return won
+
+    def start_heartbeat(self, beat: Callable[[], None]) -> None:
+        """Run beat() every HEARTBEAT_SEC in a daemon thread (once per process)."""
+        with self._guard:
+            if self._heartbeat is not None:
+                return
+            self._heartbeat = threading.Thread(target=self._beat_forever, args=(beat,),
+                                               name=f"heartbeat-{self.prefix}", daemon=True)
+        self._heartbeat.start()
+
+    def _beat_forever(self, beat: Callable[[], None]) -> None:
+        while True:
+            time.sleep(HEARTBEAT_SEC)
+            try:
+                beat()
+            except Exception as e:
+                print(f"[jobs] {self.prefix} heartbeat failed:", e)
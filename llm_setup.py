@@ -1,9 +1,37 @@
-from crewai import LLM
+import threading
 from dotenv import load_dotenv
 
 load_dotenv()
 
-llm=LLM(
-    model="gemini/gemini-2.0-flash",
-    temperature=0.1
-)
\ No newline at end of file
+MODEL       = "gemini/gemini-2.0-flash"
+TEMPERATURE = 0.1
+
+# Built on first use: importing crewai is slow and most endpoints never need it
+_llm = None
+_lock = threading.Lock()
+
+
+def get_llm():
+    global _llm
+    if _llm is None:
+        with _lock:
+            if _llm is None:
+                from crewai import LLM
+                _llm = LLM(
+                    model=MODEL,
+                    temperature=TEMPERATURE
+                )
+    return _llm
+
+
+def set_llm(llm) -> None:
+    """Replace the shared LLM (e.g. with a stand-in for benchmarks)."""
+    global _llm
+    _llm = llm
+
+
+def __getattr__(name):
+    # Keep `from llm_setup import llm` working
+    if name == "llm":
+        return get_llm()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
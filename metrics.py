@@ -0,0 +1,145 @@
+# metrics.py
+import threading, time, uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Dict, Iterable, Optional, Tuple
+
+# Per-request trace id (set by the HTTP middleware, readable anywhere downstream)
+trace_id_var: ContextVar[Optional[str]] = ContextVar("trace_id", default=None)
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+TOKEN_BUCKETS    = (16, 64, 256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _key(labels: Dict[str, str]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _fmt_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    items = list(key) + ([extra] if extra else [])
+    if not items:
+        return ""
+    esc = lambda v: v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{k}="{esc(v)}"' for k, v in items) + "}"
+
+
+class Histogram:
+    """Minimal Prometheus-style histogram (cumulative buckets + sum + count)."""
+
+    def __init__(self, name: str, help: str, buckets: Iterable[float] = DURATION_BUCKETS):
+        self.name, self.help = name, help
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._series: Dict[LabelKey, list] = {}  # key -> [bucket counts..., sum, count]
+
+    def observe(self, value: float, **labels) -> None:
+        key = _key(labels)
+        with self._lock:
+            s = self._series.get(key)
+            if s is None:
+                s = self._series[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, b in enumerate(self.buckets):
+                if value <= b:
+                    s[i] += 1
+            s[-2] += value
+            s[-1] += 1
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, s in sorted(self._series.items()):
+                for i, b in enumerate(self.buckets):
+                    lines.append(f"{self.name}_bucket{_fmt_labels(key, ('le', repr(float(b))))} {s[i]}")
+                lines.append(f"{self.name}_bucket{_fmt_labels(key, ('le', '+Inf'))} {s[-1]}")
+                lines.append(f"{self.name}_sum{_fmt_labels(key)} {s[-2]}")
+                lines.append(f"{self.name}_count{_fmt_labels(key)} {s[-1]}")
+        return "\n".join(lines)
+
+
+class Counter:
+    def __init__(self, name: str, help: str):
+        self.name, self.help = name, help
+        self._lock = threading.Lock()
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = _key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, v in sorted(self._values.items()):
+                lines.append(f"{self.name}{_fmt_labels(key)} {v}")
+        return "\n".join(lines)
+
+
+# ---------- registry ----------
+STAGE_SECONDS = Histogram("summarizer_stage_duration_seconds", "Time spent per pipeline stage")
+STAGE_ERRORS  = Counter("summarizer_stage_errors_total", "Stage invocations that raised")
+HTTP_SECONDS  = Histogram("http_request_duration_seconds", "HTTP request latency by route")
+LLM_TOKENS    = Histogram("llm_tokens", "Tokens per LLM call by stage and direction", TOKEN_BUCKETS)
+LLM_RETRIES   = Counter("llm_retries_total", "Retried LLM calls by stage")
+# Whole summarization runs (every LLM call of one crew kickoff); not to be summed with llm_tokens
+LLM_RUN_TOKENS  = Histogram("llm_run_tokens", "Tokens per summarization run by direction", TOKEN_BUCKETS)
+LLM_RUN_RETRIES = Counter("llm_run_retries_total", "Summarization runs retried from the start")
+INGEST_EVENTS = Counter("ingest_events_total", "Webhook ingestion outcomes")
+
+REGISTRY = [STAGE_SECONDS, STAGE_ERRORS, HTTP_SECONDS, LLM_TOKENS, LLM_RETRIES,
+            LLM_RUN_TOKENS, LLM_RUN_RETRIES, INGEST_EVENTS]
+
+
+def render_metrics() -> str:
+    return "\n".join(m.render() for m in REGISTRY) + "\n"
+
+
+# ---------- helpers ----------
+def new_trace_id() -> str:
+    return uuid.uuid4().hex[:16]
+
+
+def approx_tokens(text: str) -> int:
+    """Cheap token estimate (~4 chars/token) for when the provider doesn't report usage."""
+    return len(text or "") // 4
+
+
+@contextmanager
+def span(stage: str):
+    """Time a block and record it under `stage`; errors are counted and re-raised."""
+    t0 = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        STAGE_ERRORS.inc(stage=stage)
+        raise
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - t0, stage=stage)
+
+
+def timed(stage: str):
+    """Decorator form of `span`."""
+    def deco(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return deco
+
+
+def record_llm_call(stage: str, input_tokens: int, output_tokens: int, retries: int = 0) -> None:
+    LLM_TOKENS.observe(input_tokens, stage=stage, direction="input")
+    LLM_TOKENS.observe(output_tokens, stage=stage, direction="output")
+    if retries:
+        LLM_RETRIES.inc(retries, stage=stage)
+
+
+def record_llm_run(input_tokens: int, output_tokens: int, retries: int = 0) -> None:
+    LLM_RUN_TOKENS.observe(input_tokens, direction="input")
+    LLM_RUN_TOKENS.observe(output_tokens, direction="output")
+    if retries:
+        LLM_RUN_RETRIES.inc(retries)
@@ -0,0 +1,63 @@
+# normalize.py
+# Parsing of Recall transcript downloads. Kept free of app state and heavy
+# imports so the ingestion process pool can run it in worker processes.
+import json
+from typing import Any, Dict, List, Tuple
+
+from transcript_export import segment_lines
+
+
+def normalize_segments(tj: Any) -> List[Dict[str, Any]]:
+    out: List[Dict[str, Any]] = []
+    if isinstance(tj, dict):
+        for k in ("segments", "results", "utterances", "data"):
+            v = tj.get(k)
+            if isinstance(v, list):
+                for seg in v:
+                    out.append(_map_segment(seg))
+                return out
+    if isinstance(tj, list):
+        for entry in tj:
+            participant = entry.get("participant") or {}
+            name = participant.get("name") or participant.get("id") or "Unknown"
+            for w in entry.get("words", []):
+                out.append({
+                    "speaker": name,
+                    "start": w.get("start_timestamp", {}).get("absolute"),
+                    "end": w.get("end_timestamp", {}).get("absolute"),
+                    "offset": w.get("start_timestamp", {}).get("relative"),
+                    "text": w.get("text", "")
+                })
+        return out
+    return out
+
+
+def _map_segment(seg: Dict[str, Any]) -> Dict[str, Any]:
+    p = seg.get("participant") or seg.get("speaker") or {}
+    if isinstance(p, dict):
+        name = p.get("name") or p.get("display_name") or p.get("id")
+    else:
+        name = str(p)
+    return {
+        "speaker": name or "Unknown",
+        "start": seg.get("start"),
+        "end": seg.get("end"),
+        "text": seg.get("text") or seg.get("utterance") or ""
+    }
+
+
+def as_plaintext(segments: List[Dict[str, Any]]) -> str:
+    return "\n".join(
+        f"{s.get('speaker','Unknown')}: {(s.get('text') or '').strip()}"
+        for s in segments if (s.get('text') or '').strip()
+    )
+
+
+def parse_download(raw: bytes) -> Tuple[str, bytes]:
+    """
+    Raw download -> (plaintext body, segments sidecar JSONL). Returns final
+    bytes rather than the segment list so only compact results cross the
+    process boundary.
+    """
+    segments = normalize_segments(json.loads(raw))
+    return as_plaintext(segments), b"".join(segment_lines(segments))
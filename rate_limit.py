@@ -0,0 +1,42 @@
+# rate_limit.py
+import threading, time
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket. Refills `rate` units per second up to `capacity`.
+    Used to keep batch work under provider quotas (LLM tokens/min, API calls/sec).
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        if rate <= 0 or capacity <= 0:
+            raise ValueError("rate and capacity must be positive")
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, amount: float = 1.0) -> float:
+        """
+        Block until `amount` units are available, then consume them.
+        Requests larger than the bucket are clamped to its capacity so they
+        can still go through (they just drain the whole budget).
+        Returns the number of seconds spent waiting.
+        """
+        amount = min(float(amount), self.capacity)
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return waited
+                delay = (amount - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
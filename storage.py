@@ -0,0 +1,459 @@
+# storage.py
+import hashlib, os, tempfile, threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+CHUNK_SIZE = 64 * 1024
+LIST_PAGE_SIZE = 1000  # S3's max keys per list / delete call
+
+
+@dataclass(frozen=True)
+class ObjectInfo:
+    key: str
+    size: int
+    mtime: float  # seconds since the epoch
+    etag: str
+
+    @property
+    def name(self) -> str:
+        return self.key.rsplit("/", 1)[-1]
+
+
+class Storage:
+    """
+    Blob store addressed by '/'-separated keys, e.g.
+    "transcripts_projects/<project>/transcripts/<file>" or "summary_cache/<key>.json".
+    A "prefix" is a directory-like key without the trailing slash.
+
+    Writes are atomic: readers see either the old object or the complete new one.
+    """
+
+    # True when move_prefix is a constant-time rename (local FS), False when
+    # it has to copy every object (object stores)
+    cheap_rename = False
+
+    def read_bytes(self, key: str) -> bytes:
+        """Whole object. Raises FileNotFoundError if missing."""
+        raise NotImplementedError
+
+    def read_text(self, key: str, encoding: str = "utf-8") -> str:
+        return self.read_bytes(key).decode(encoding)
+
+    def iter_bytes(self, key: str, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+        """Stream bytes [start, end] (inclusive; end=None means to EOF) in CHUNK_SIZE pieces."""
+        raise NotImplementedError
+
+    def put_bytes(self, key: str, data: bytes) -> None:
+        raise NotImplementedError
+
+    def put_text(self, key: str, text: str, encoding: str = "utf-8") -> None:
+        self.put_bytes(key, text.encode(encoding))
+
+    def put_stream(self, key: str, chunks: Iterable[bytes]) -> None:
+        """Write an object from an iterable of chunks without holding it all in memory."""
+        raise NotImplementedError
+
+    def stat(self, key: str) -> Optional[ObjectInfo]:
+        """Object metadata, or None if it doesn't exist."""
+        raise NotImplementedError
+
+    def exists(self, key: str) -> bool:
+        return self.stat(key) is not None
+
+    def list(self, prefix: str, recursive: bool = True) -> Iterator[ObjectInfo]:
+        """Objects under prefix/, fetched a page at a time."""
+        raise NotImplementedError
+
+    def list_dirs(self, prefix: str) -> List[str]:
+        """Names of the immediate sub-prefixes of prefix/."""
+        raise NotImplementedError
+
+    def has_prefix(self, prefix: str) -> bool:
+        raise NotImplementedError
+
+    def ensure_prefix(self, prefix: str) -> None:
+        """Make an (empty) prefix visible to list_dirs/has_prefix."""
+        raise NotImplementedError
+
+    def delete(self, key: str) -> bool:
+        raise NotImplementedError
+
+    def delete_many(self, keys: Iterable[str]) -> int:
+        return sum(1 for k in keys if self.delete(k))
+
+    def delete_prefix(self, prefix: str) -> int:
+        return self.delete_many([o.key for o in self.list(prefix)])
+
+    def move_prefix(self, src: str, dst: str) -> None:
+        raise NotImplementedError
+
+    def version(self, prefix: str) -> Optional[Tuple[str, float]]:
+        """
+        Cheap change token and last-modified time for everything directly under
+        prefix/, or None if the backend can't tell without listing.
+        """
+        return None
+
+    def location(self, key: str) -> str:
+        """Human-readable location for API responses and logs."""
+        return key
+
+
+# ---------- local filesystem ----------
+class LocalStorage(Storage):
+    cheap_rename = True
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+
+    def path(self, key: str) -> Path:
+        if ".." in key.split("/"):
+            raise ValueError(f"bad storage key {key!r}")
+        return self.root / key
+
+    def location(self, key: str) -> str:
+        return str(self.path(key))
+
+    def read_bytes(self, key: str) -> bytes:
+        return self.path(key).read_bytes()
+
+    def iter_bytes(self, key: str, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+        with open(self.path(key), "rb") as f:
+            f.seek(start)
+            left = None if end is None else end - start + 1
+            while left is None or left > 0:
+                chunk = f.read(CHUNK_SIZE if left is None else min(CHUNK_SIZE, left))
+                if not chunk:
+                    break
+                if left is not None:
+                    left -= len(chunk)
+                yield chunk
+
+    def put_bytes(self, key: str, data: bytes) -> None:
+        self.put_stream(key, [data])
+
+    def put_stream(self, key: str, chunks: Iterable[bytes]) -> None:
+        # Write next to the target, then rename over it (atomic on POSIX)
+        p = self.path(key)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=p.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in chunks:
+                    f.write(chunk)
+            os.replace(tmp, p)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except FileNotFoundError:
+                pass
+            raise
+
+    def _info(self, key: str, st: os.stat_result) -> ObjectInfo:
+        return ObjectInfo(key, st.st_size, st.st_mtime, f"{st.st_size:x}-{st.st_mtime_ns:x}")
+
+    def stat(self, key: str) -> Optional[ObjectInfo]:
+        try:
+            st = self.path(key).stat()
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+        return self._info(key, st) if not os.path.isdir(self.path(key)) else None
+
+    def list(self, prefix: str, recursive: bool = True) -> Iterator[ObjectInfo]:
+        base = self.path(prefix)
+        if not base.is_dir():
+            return
+        if not recursive:
+            with os.scandir(base) as it:
+                for e in it:
+                    if e.is_file() and not e.name.startswith(".tmp-"):
+                        yield self._info(f"{prefix}/{e.name}", e.stat())
+            return
+        for dirpath, _, files in os.walk(base):
+            rel = os.path.relpath(dirpath, self.root).replace(os.sep, "/")
+            for name in files:
+                if not name.startswith(".tmp-"):
+                    yield self._info(f"{rel}/{name}", os.stat(os.path.join(dirpath, name)))
+
+    def list_dirs(self, prefix: str) -> List[str]:
+        base = self.path(prefix)
+        if not base.is_dir():
+            return []
+        with os.scandir(base) as it:
+            return [e.name for e in it if e.is_dir()]
+
+    def has_prefix(self, prefix: str) -> bool:
+        return self.path(prefix).is_dir()
+
+    def ensure_prefix(self, prefix: str) -> None:
+        self.path(prefix).mkdir(parents=True, exist_ok=True)
+
+    def delete(self, key: str) -> bool:
+        try:
+            self.path(key).unlink()
+            return True
+        except FileNotFoundError:
+            return False
+
+    def delete_prefix(self, prefix: str) -> int:
+        base = self.path(prefix)
+        if not base.is_dir():
+            return 0
+        deleted = 0
+        for dirpath, dirs, files in os.walk(base, topdown=False):
+            for name in files:
+                try:
+                    os.unlink(os.path.join(dirpath, name))
+                    deleted += 1
+                except FileNotFoundError:
+                    pass
+            for name in dirs:
+                try:
+                    os.rmdir(os.path.join(dirpath, name))
+                except OSError:
+                    pass
+        try:
+            base.rmdir()
+        except OSError:
+            pass
+        return deleted
+
+    def move_prefix(self, src: str, dst: str) -> None:
+        d = self.path(dst)
+        d.parent.mkdir(parents=True, exist_ok=True)
+        self.path(src).rename(d)
+
+    def version(self, prefix: str) -> Optional[Tuple[str, float]]:
+        # Creating, removing or renaming an entry bumps the directory mtime
+        try:
+            st = self.path(prefix).stat()
+        except FileNotFoundError:
+            return "0", 0.0
+        return f"{st.st_mtime_ns:x}", st.st_mtime
+
+
+# ---------- S3-compatible object store ----------
+class _ChunkReader:
+    """File-like read() over an iterable of byte chunks (for boto3 upload_fileobj)."""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._it = iter(chunks)
+        self._buf = b""
+
+    def read(self, n: int = -1) -> bytes:
+        while n < 0 or len(self._buf) < n:
+            try:
+                self._buf += next(self._it)
+            except StopIteration:
+                break
+        if n < 0:
+            out, self._buf = self._buf, b""
+        else:
+            out, self._buf = self._buf[:n], self._buf[n:]
+        return out
+
+
+class S3Storage(Storage):
+    """
+    S3 or any S3-compatible store (MinIO, moto server, ...) via boto3.
+    PUTs and completed multipart uploads are atomic. There is no rename:
+    move_prefix copies server-side in parallel, then bulk-deletes.
+    """
+
+    cheap_rename = False
+
+    def __init__(self, bucket: str, prefix: str = "", endpoint_url: Optional[str] = None,
+                 max_workers: int = 16):
+        try:
+            import boto3
+            from botocore.config import Config
+            from botocore.exceptions import ClientError
+        except ImportError as e:
+            raise RuntimeError("STORAGE_BACKEND=s3 requires boto3 (pip install boto3)") from e
+        self._ClientError = ClientError
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        self.max_workers = max_workers
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=endpoint_url,
+            config=Config(max_pool_connections=max_workers,
+                          retries={"max_attempts": 5, "mode": "adaptive"}),
+        )
+
+    def _k(self, key: str) -> str:
+        return f"{self.prefix}/{key}" if self.prefix else key
+
+    def _unk(self, k: str) -> str:
+        return k[len(self.prefix) + 1:] if self.prefix else k
+
+    def _missing(self, e) -> bool:
+        return e.response.get("Error", {}).get("Code") in ("NoSuchKey", "404", "NotFound")
+
+    def location(self, key: str) -> str:
+        return f"s3://{self.bucket}/{self._k(key)}"
+
+    def read_bytes(self, key: str) -> bytes:
+        try:
+            obj = self.client.get_object(Bucket=self.bucket, Key=self._k(key))
+        except self._ClientError as e:
+            if self._missing(e):
+                raise FileNotFoundError(key) from e
+            raise
+        return obj["Body"].read()
+
+    def iter_bytes(self, key: str, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+        kwargs = {}
+        if start or end is not None:
+            kwargs["Range"] = f"bytes={start}-{'' if end is None else end}"
+        try:
+            obj = self.client.get_object(Bucket=self.bucket, Key=self._k(key), **kwargs)
+        except self._ClientError as e:
+            if self._missing(e):
+                raise FileNotFoundError(key) from e
+            raise
+        body = obj["Body"]
+        try:
+            yield from body.iter_chunks(CHUNK_SIZE)
+        finally:
+            body.close()
+
+    def put_bytes(self, key: str, data: bytes) -> None:
+        self.client.put_object(Bucket=self.bucket, Key=self._k(key), Body=data)
+
+    def put_stream(self, key: str, chunks: Iterable[bytes]) -> None:
+        # Multipart for large bodies; the object only appears once complete
+        self.client.upload_fileobj(_ChunkReader(chunks), self.bucket, self._k(key))
+
+    def stat(self, key: str) -> Optional[ObjectInfo]:
+        try:
+            h = self.client.head_object(Bucket=self.bucket, Key=self._k(key))
+        except self._ClientError as e:
+            if self._missing(e):
+                return None
+            raise
+        return ObjectInfo(key, h["ContentLength"], h["LastModified"].timestamp(), h["ETag"].strip('"'))
+
+    def _pages(self, prefix: str, delimiter: bool):
+        kwargs = {"Bucket": self.bucket, "Prefix": self._k(prefix) + "/",
+                  "PaginationConfig": {"PageSize": LIST_PAGE_SIZE}}
+        if delimiter:
+            kwargs["Delimiter"] = "/"
+        return self.client.get_paginator("list_objects_v2").paginate(**kwargs)
+
+    def list(self, prefix: str, recursive: bool = True) -> Iterator[ObjectInfo]:
+        for page in self._pages(prefix, delimiter=not recursive):
+            for o in page.get("Contents", []):
+                yield ObjectInfo(self._unk(o["Key"]), o["Size"], o["LastModified"].timestamp(),
+                                 o["ETag"].strip('"'))
+
+    def list_dirs(self, prefix: str) -> List[str]:
+        out = []
+        for page in self._pages(prefix, delimiter=True):
+            for cp in page.get("CommonPrefixes", []):
+                out.append(cp["Prefix"].rstrip("/").rsplit("/", 1)[-1])
+        return out
+
+    def has_prefix(self, prefix: str) -> bool:
+        r = self.client.list_objects_v2(Bucket=self.bucket, Prefix=self._k(prefix) + "/", MaxKeys=1)
+        return r.get("KeyCount", 0) > 0
+
+    def ensure_prefix(self, prefix: str) -> None:
+        # Object stores have no empty directories; a marker keeps the prefix listed
+        if not self.has_prefix(prefix):
+            self.put_bytes(f"{prefix}/.keep", b"")
+
+    def delete(self, key: str) -> bool:
+        self.client.delete_object(Bucket=self.bucket, Key=self._k(key))
+        return True
+
+    def delete_many(self, keys: Iterable[str]) -> int:
+        deleted, batch = 0, []
+        for key in keys:
+            batch.append({"Key": self._k(key)})
+            if len(batch) == LIST_PAGE_SIZE:
+                deleted += self._delete_batch(batch)
+                batch = []
+        if batch:
+            deleted += self._delete_batch(batch)
+        return deleted
+
+    def _delete_batch(self, batch: list) -> int:
+        r = self.client.delete_objects(Bucket=self.bucket, Delete={"Objects": batch, "Quiet": True})
+        for err in r.get("Errors", []):
+            print("[storage] delete failed:", err.get("Key"), err.get("Message"))
+        return len(batch) - len(r.get("Errors", []))
+
+    def move_prefix(self, src: str, dst: str) -> None:
+        keys = [o.key for o in self.list(src)]
+
+        def copy(key: str):
+            self.client.copy_object(Bucket=self.bucket,
+                                    CopySource={"Bucket": self.bucket, "Key": self._k(key)},
+                                    Key=self._k(dst + key[len(src):]))
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as ex:
+            list(ex.map(copy, keys))
+        self.delete_many(keys)
+
+
+def invalid_project_name(name: str) -> bool:
+    """
+    Basic sanitation for a name used as one segment of a key (a project,
+    a transcript file): no path traversal, no invalid FS chars.
+    """
+    if not name or name.strip() == "":
+        return True
+    bad_chars = set('\\/:*?"<>|')
+    return any(c in bad_chars for c in name) or ".." in name or name.startswith(".")
+
+
+# ---------- configured instance ----------
+_storage: Optional[Storage] = None
+_lock = threading.Lock()
+
+
+def from_env() -> Storage:
+    """
+    STORAGE_BACKEND=local (default): files under STORAGE_ROOT (default: cwd),
+    same layout as before. STORAGE_BACKEND=s3: S3_BUCKET, optional S3_PREFIX
+    and S3_ENDPOINT_URL (e.g. a local MinIO); credentials come from the usual
+    AWS environment/config.
+    """
+    backend = os.getenv("STORAGE_BACKEND", "local").strip().lower()
+    if backend == "s3":
+        return S3Storage(
+            bucket=os.environ["S3_BUCKET"],
+            prefix=os.getenv("S3_PREFIX", ""),
+            endpoint_url=os.getenv("S3_ENDPOINT_URL") or None,
+        )
+    if backend != "local":
+        raise ValueError(f"unknown STORAGE_BACKEND {backend!r}")
+    return LocalStorage(Path(os.getenv("STORAGE_ROOT") or Path.cwd()))
+
+
+def get_storage() -> Storage:
+    global _storage
+    if _storage is None:
+        with _lock:
+            if _storage is None:
+                _storage = from_env()
+    return _storage
+
+
+def set_storage(storage: Storage) -> None:
+    """Replace the shared backend (e.g. with a stand-in for tests or benchmarks)."""
+    global _storage
+    _storage = storage
+
+
+def listing_version(items: Iterable[ObjectInfo]) -> Tuple[str, float]:
+    """Change token for a listing when the backend has no cheap version()."""
+    h = hashlib.sha1()
+    latest = 0.0
+    for o in items:
+        h.update(f"{o.key}\0{o.etag}\0".encode("utf-8"))
+        latest = max(latest, o.mtime)
+    return h.hexdigest()[:16], latest
@@ -1,14 +1,35 @@
+import queue, threading, time
+from contextlib import contextmanager
+from contextvars import ContextVar
 from time import sleep
-from crewai import Crew
-from agent_factory import (
-    create_summarizer_agent,
-    create_consultant_agent,
-    create_report_generator_agent,
-    create_task1,
-    create_task2,
-    create_task3,
-)
-from llm_setup import llm
+from typing import Dict, Optional, Tuple
+from llm_setup import get_llm
+from metrics import STAGE_SECONDS, LLM_RETRIES, LLM_RUN_RETRIES, record_llm_call, record_llm_run, span
+
+# CrewAI (and agent_factory, which imports it) are loaded on first use so
+# that importing this module stays cheap for the I/O-only endpoints.
+_crew_stack = None
+_load_lock = threading.Lock()
+
+
+def _load():
+    """Import CrewAI + agent_factory and build the LLM once. Returns (Crew, agent_factory)."""
+    global _crew_stack
+    if _crew_stack is None:
+        with _load_lock:
+            if _crew_stack is None:
+                with span("llm_stack_load"):
+                    from crewai import Crew
+                    import agent_factory
+                    get_llm()
+                    _listen_llm_calls()
+                    _crew_stack = (Crew, agent_factory)
+    return _crew_stack
+
+
+def warm_up() -> None:
+    """Load the LLM stack and build a first crew ahead of the first summarization request."""
+    get_pipeline().prebuild(1)
 
 
 def _to_text(result) -> str:
@@ -36,46 +57,230 @@ def _to_text(result) -> str:
     return str(result)
 
 
-def run_summary(text: str) -> str:
-    """Run Crew-based summarization pipeline and return a *string*."""
-    summarizer_agent = create_summarizer_agent(text, llm)
-    consultant_agent = create_consultant_agent(llm)
-    report_generator_agent = create_report_generator_agent(llm)
+# Per-run timing marks for the task callback. Crews are shared across runs,
+# so this can't live in a closure; each run sets its own dict.
+_run_marks: ContextVar[Optional[dict]] = ContextVar("run_marks", default=None)
+
+
+def _on_task_done(output) -> None:
+    # Tasks run sequentially, so each task's duration is the gap since the
+    # previous one finished (or since kickoff for the first task).
+    marks = _run_marks.get()
+    if marks is None:
+        return
+    now = time.perf_counter()
+    stage = f"task:{getattr(output, 'name', None) or 'unnamed'}"
+    STAGE_SECONDS.observe(now - marks["t"], stage=stage)
+    marks["t"] = now
+
+
+def _agent_usage(agent) -> Tuple[int, int]:
+    """Provider-reported (prompt, completion) tokens this agent has used so far (cumulative)."""
+    try:
+        usage = agent._token_process.get_summary()
+    except Exception:
+        return 0, 0
+    return (usage.prompt_tokens or 0, usage.completion_tokens or 0)
+
+
+# Agents built by SummaryPipeline, by agent id: [stage, agent, prompt, completion, failed]
+# where the counts are the agent's usage as of its last recorded LLM call, and
+# `failed` the calls that failed since its last call started.
+_tracked: Dict[str, list] = {}
+_tracked_lock = threading.Lock()
+
+
+def _track(task) -> None:
+    agent = task.agent
+    _tracked[str(agent.id)] = [f"task:{task.name}", agent, *_agent_usage(agent), 0]
+
+
+def _event_agent(event) -> Optional[list]:
+    agent_id = getattr(event, "agent_id", None) or getattr(getattr(event, "from_agent", None), "id", None)
+    return _tracked.get(str(agent_id))
+
+
+def _untrack(crew) -> None:
+    with _tracked_lock:
+        for agent in crew.agents:
+            _tracked.pop(str(agent.id), None)
+
+
+def _on_llm_call_done(source, event) -> None:
+    """
+    One LLM call finished. CrewAI adds the provider's `usage` for the call to
+    the agent's counters before emitting this event, so the change since the
+    agent's previous call is this call's input/output tokens.
+    """
+    with _tracked_lock:
+        entry = _event_agent(event)
+        if entry is None:
+            return  # not one of our agents (or a call made outside a task)
+        prompt, completion = _agent_usage(entry[1])
+        tokens_in, tokens_out = max(0, prompt - entry[2]), max(0, completion - entry[3])
+        entry[2], entry[3] = prompt, completion
+    record_llm_call(entry[0], tokens_in, tokens_out)
+
+
+def _on_llm_call_started(source, event) -> None:
+    # The agent executor retries failed calls itself: failures followed by
+    # another call were retried (a final failure ends the task instead)
+    with _tracked_lock:
+        entry = _event_agent(event)
+        if entry is None or not entry[4]:
+            return
+        retried, entry[4] = entry[4], 0
+    LLM_RETRIES.inc(retried, stage=entry[0])
 
-    task1 = create_task1(text, summarizer_agent)
-    task2 = create_task2(text, consultant_agent)
-    task3 = create_task3(task1, task2, report_generator_agent)
 
-    crew = Crew(
-        agents=[summarizer_agent, consultant_agent, report_generator_agent],
-        tasks=[task1, task2, task3],
-        verbose=True,
-    )
+def _on_llm_call_failed(source, event) -> None:
+    with _tracked_lock:
+        entry = _event_agent(event)
+        if entry is not None:
+            entry[4] += 1
+
+
+def _listen_llm_calls() -> None:
+    # The LLM call events aren't re-exported at the package level; import their module
+    try:
+        from crewai.events import crewai_event_bus
+        from crewai.events.types.llm_events import (
+            LLMCallCompletedEvent, LLMCallFailedEvent, LLMCallStartedEvent,
+        )
+    except ImportError:  # CrewAI < 0.177
+        from crewai.utilities.events import crewai_event_bus
+        from crewai.utilities.events.llm_events import (
+            LLMCallCompletedEvent, LLMCallFailedEvent, LLMCallStartedEvent,
+        )
+    crewai_event_bus.on(LLMCallStartedEvent)(_on_llm_call_started)
+    crewai_event_bus.on(LLMCallCompletedEvent)(_on_llm_call_done)
+    crewai_event_bus.on(LLMCallFailedEvent)(_on_llm_call_failed)
+
+
+def _crew_usage(crew) -> Tuple[int, int]:
+    prompt = completion = 0
+    for agent in crew.agents:
+        p, c = _agent_usage(agent)
+        prompt, completion = prompt + p, completion + c
+    return prompt, completion
+
+
+class SummaryPipeline:
+    """
+    Agents, tasks and crew for one LLM configuration, built once and reused.
+
+    Nothing here depends on a transcript: task prompts carry a {text}
+    placeholder that crew.kickoff(inputs=...) fills in per run. A Crew still
+    holds per-run state (interpolated prompts, task outputs), so concurrent
+    runs each check out their own crew; idle crews go back to the pool
+    instead of being rebuilt.
+    """
 
-    # Simple retry for transient LLM/provider hiccups (e.g., 503 overloaded)
     MAX_RETRIES = 3
     BACKOFF_SEC = 3
-    last_err = None
 
-    for attempt in range(1, MAX_RETRIES + 1):
+    def __init__(self, llm):
+        self.llm = llm
+        self._idle: "queue.LifoQueue" = queue.LifoQueue()
+        self.crews_built = 0
+
+    def _build(self):
+        Crew, af = _load()
+        summarizer_agent = af.create_summarizer_agent(self.llm)
+        consultant_agent = af.create_consultant_agent(self.llm)
+        report_generator_agent = af.create_report_generator_agent(self.llm)
+
+        task1 = af.create_task1(summarizer_agent)
+        task2 = af.create_task2(consultant_agent)
+        task3 = af.create_task3(task1, task2, report_generator_agent)
+        with _tracked_lock:
+            for task in (task1, task2, task3):
+                _track(task)
+
+        self.crews_built += 1
+        return Crew(
+            agents=[summarizer_agent, consultant_agent, report_generator_agent],
+            tasks=[task1, task2, task3],
+            verbose=True,
+            task_callback=_on_task_done,
+        )
+
+    def prebuild(self, n: int) -> None:
+        for _ in range(n):
+            self._idle.put(self._build())
+
+    @contextmanager
+    def checkout(self):
+        """Borrow an idle crew (or build one). Crews that raised are dropped, not reused."""
+        try:
+            crew = self._idle.get_nowait()
+        except queue.Empty:
+            with span("crew_build"):
+                crew = self._build()
         try:
-            result = crew.kickoff(inputs={"text": text})
-            return _to_text(result)
-        except Exception as e:
-            last_err = e
-            # Retry on transient-looking errors
-            msg = str(e).lower()
-            transient = any(
-                key in msg
-                for key in ("503", "unavailable", "overloaded", "timeout", "rate limit")
-            )
-            if attempt < MAX_RETRIES and transient:
-                sleep(BACKOFF_SEC * attempt)
-                continue
-            # Not transient or out of retries
+            yield crew
+        except BaseException:
+            _untrack(crew)
             raise
+        self._idle.put(crew)
+
+    def run(self, text: str) -> str:
+        """Run the summarization crew on `text` and return a *string*."""
+        # Simple retry for transient LLM/provider hiccups (e.g., 503 overloaded)
+        last_err = None
+
+        for attempt in range(1, self.MAX_RETRIES + 1):
+            try:
+                with self.checkout() as crew:
+                    # The crew is ours until it goes back to the pool, so the
+                    # change in its agents' usage counters is this run's usage
+                    before = _crew_usage(crew)
+                    token = _run_marks.set({"t": time.perf_counter()})
+                    try:
+                        with span("crew_kickoff"):
+                            result = crew.kickoff(inputs={"text": text})
+                    finally:
+                        _run_marks.reset(token)
+                    after = _crew_usage(crew)
+                record_llm_run(max(0, after[0] - before[0]), max(0, after[1] - before[1]),
+                               retries=attempt - 1)
+                return _to_text(result)
+            except Exception as e:
+                last_err = e
+                # Retry on transient-looking errors
+                msg = str(e).lower()
+                transient = any(
+                    key in msg
+                    for key in ("503", "unavailable", "overloaded", "timeout", "rate limit")
+                )
+                if attempt < self.MAX_RETRIES and transient:
+                    sleep(self.BACKOFF_SEC * attempt)
+                    continue
+                # Not transient or out of retries
+                if attempt > 1:
+                    LLM_RUN_RETRIES.inc(attempt - 1)
+                raise
+
+        # Should never get here, but just in case
+        if last_err:
+            raise last_err
+        return ""
+
 
-    # Should never get here, but just in case
-    if last_err:
-        raise last_err
-    return ""
\ No newline at end of file
+# One pipeline per LLM configuration (keyed by the LLM object in use)
+_pipelines: Dict[int, SummaryPipeline] = {}
+_pipelines_lock = threading.Lock()
+
+
+def get_pipeline() -> SummaryPipeline:
+    llm = get_llm()
+    with _pipelines_lock:
+        pipeline = _pipelines.get(id(llm))
+        if pipeline is None:
+            pipeline = _pipelines[id(llm)] = SummaryPipeline(llm)
+        return pipeline
+
+
+def run_summary(text: str) -> str:
+    """Run Crew-based summarization pipeline and return a *string*."""
+    return get_pipeline().run(text)
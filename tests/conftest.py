@@ -0,0 +1,11 @@
+# tests/conftest.py
+import os, sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+# create_bot (imported by bot_dispatcher) refuses to load without an API key;
+# nothing under tests/ talks to Recall
+os.environ.setdefault("RECALLAI_API_KEY", "test")
@@ -0,0 +1,116 @@
+# tests/test_bot_dispatcher.py
+"""Meeting-list parsing for bot dispatch: CSV, iCalendar and their start times."""
+import pytest
+
+from bot_dispatcher import _ics_datetime, load_meetings, parse_csv, parse_ics
+
+MEET = "https://meet.google.com/abc-defg-hij"
+ZOOM = "https://acme.zoom.us/j/123456789?pwd=xyz"
+
+
+@pytest.mark.parametrize("params, value, expected", [
+    ("", "20250301T100000Z", "2025-03-01T10:00:00+00:00"),
+    ("TZID=America/New_York", "20250301T100000", "2025-03-01T10:00:00-05:00"),
+    ("TZID=Europe/Berlin", "20250701T100000", "2025-07-01T10:00:00+02:00"),
+    ("", "20250301T100000", "2025-03-01T10:00:00+05:30"),                   # floating: IST
+    ("TZID=Not/AZone", "20250301T100000", "2025-03-01T10:00:00+05:30"),     # unknown zone: IST
+    ("VALUE=DATE", "20250301", None),                                       # all-day
+    ("value=date", "20250301", None),
+    ("", " 20250301T100000Z ", "2025-03-01T10:00:00+00:00"),
+])
+def test_ics_datetime(params, value, expected):
+    assert _ics_datetime(params, value) == expected
+
+
+@pytest.mark.parametrize("value", ["20250301", "2025-03-01T10:00:00", "", "20250301T10:00"])
+def test_ics_datetime_malformed(value):
+    with pytest.raises(ValueError):
+        _ics_datetime("", value)
+
+
+ICS = "\r\n".join([
+    "BEGIN:VCALENDAR",
+    "VERSION:2.0",
+    "BEGIN:VEVENT",
+    "SUMMARY:Standup",
+    "DTSTART;TZID=Europe/Berlin:20250701T100000",
+    "LOCATION:" + MEET,
+    "END:VEVENT",
+    "BEGIN:VEVENT",
+    "SUMMARY:Folded description, zoom link split across lines",
+    "DTSTART:20250701T120000Z",
+    "DESCRIPTION:Join here:\\n" + ZOOM[:20],
+    " " + ZOOM[20:] + "\\nThanks",
+    "END:VEVENT",
+    "BEGIN:VEVENT",
+    "SUMMARY:No meeting link",
+    "DTSTART:20250701T130000Z",
+    "LOCATION:Room 4",
+    "END:VEVENT",
+    "BEGIN:VEVENT",
+    "SUMMARY:All-day, link in a vendor property",
+    "DTSTART;VALUE=DATE:20250702",
+    "X-GOOGLE-CONFERENCE:" + MEET,
+    "END:VEVENT",
+    "BEGIN:VEVENT",
+    "DTSTART:not-a-date",
+    "URL:" + MEET,
+    "END:VEVENT",
+    "END:VCALENDAR",
+])
+
+
+def test_parse_ics():
+    assert parse_ics(ICS) == [
+        {"meeting_url": MEET, "project_name": "", "bot_name": "", "start_time": "2025-07-01T10:00:00+02:00"},
+        {"meeting_url": ZOOM, "project_name": "", "bot_name": "", "start_time": "2025-07-01T12:00:00+00:00"},
+        {"meeting_url": MEET, "project_name": "", "bot_name": "", "start_time": ""},
+        {"meeting_url": MEET, "project_name": "", "bot_name": "", "start_time": ""},
+    ]
+
+
+@pytest.mark.parametrize("text", [
+    "",
+    "BEGIN:VCALENDAR\r\nEND:VCALENDAR",
+    "BEGIN:VEVENT\r\nLOCATION:" + MEET,          # never closed
+    "LOCATION:" + MEET + "\r\nEND:VEVENT",       # never opened
+])
+def test_parse_ics_no_events(text):
+    assert parse_ics(text) == []
+
+
+def test_parse_csv():
+    text = "\n".join([
+        "Meeting_URL , Project , Bot_Name, start, notes",
+        f" {MEET} , sales , Notetaker , 2025-07-01T10:00:00Z , ignored",
+        ",,,,",
+        f"{ZOOM},,,,",
+    ])
+    assert parse_csv(text) == [
+        {"meeting_url": MEET, "project_name": "sales", "bot_name": "Notetaker",
+         "start_time": "2025-07-01T10:00:00Z"},
+        {"meeting_url": ZOOM, "project_name": "", "bot_name": "", "start_time": ""},
+    ]
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("url\n" + MEET, [MEET]),
+    ("meeting_url,url\n,fallback", ["fallback"]),
+    ("meeting_url\n", []),
+    ("", []),
+    ("project_name\nsales", [""]),                # kept; start_batch marks it invalid
+    ("meeting_url\n" + MEET + ",extra,cells", [MEET]),
+])
+def test_parse_csv_urls(text, expected):
+    assert [m["meeting_url"] for m in parse_csv(text)] == expected
+
+
+@pytest.mark.parametrize("content, filename, n", [
+    (ICS, "calendar.ics", 4),
+    (ICS, "", 4),                                  # sniffed from BEGIN:VCALENDAR
+    ("\n  " + ICS, "export.txt", 4),
+    ("meeting_url\n" + MEET, "meetings.csv", 1),
+    ("meeting_url\n" + MEET, "MEETINGS.ICS", 0),   # named .ics: parsed as iCalendar
+])
+def test_load_meetings(content, filename, n):
+    assert len(load_meetings(content, filename)) == n
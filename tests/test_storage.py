@@ -0,0 +1,113 @@
+# tests/test_storage.py
+"""
+The Storage contract, run against LocalStorage and against S3Storage on
+moto's in-process S3 stand-in (no network, no credentials).
+
+    pip install -r requirements-dev.txt && python -m pytest tests
+"""
+import os
+
+import pytest
+
+from storage import LIST_PAGE_SIZE, LocalStorage, S3Storage
+
+
+@pytest.fixture(params=["local", "s3"])
+def store(request, tmp_path, monkeypatch):
+    if request.param == "local":
+        yield LocalStorage(tmp_path)
+        return
+    moto = pytest.importorskip("moto")
+    for var, value in (("AWS_ACCESS_KEY_ID", "test"), ("AWS_SECRET_ACCESS_KEY", "test"),
+                       ("AWS_DEFAULT_REGION", "us-east-1")):
+        monkeypatch.setenv(var, value)
+    with moto.mock_aws():
+        s3 = S3Storage("contract", prefix="app", max_workers=4)
+        s3.client.create_bucket(Bucket="contract")
+        yield s3
+
+
+def test_put_read_stat(store):
+    store.put_text("a/b/one.txt", "héllo")
+    assert store.read_text("a/b/one.txt") == "héllo"
+    assert store.read_bytes("a/b/one.txt") == "héllo".encode("utf-8")
+    info = store.stat("a/b/one.txt")
+    assert info.key == "a/b/one.txt" and info.name == "one.txt"
+    assert info.size == len("héllo".encode("utf-8")) and info.etag
+    assert store.exists("a/b/one.txt")
+    assert store.stat("a/b/missing.txt") is None
+    with pytest.raises(FileNotFoundError):
+        store.read_bytes("a/b/missing.txt")
+
+
+def test_overwrite_changes_etag(store):
+    store.put_text("k.txt", "v1")
+    first = store.stat("k.txt").etag
+    store.put_text("k.txt", "version two")
+    assert store.read_text("k.txt") == "version two"
+    assert store.stat("k.txt").etag != first
+
+
+def test_put_stream_multipart(store):
+    # Past boto3's 8 MiB multipart threshold
+    chunk = os.urandom(1024 * 1024)
+    store.put_stream("big.bin", (chunk for _ in range(9)))
+    assert store.stat("big.bin").size == 9 * len(chunk)
+    assert b"".join(store.iter_bytes("big.bin", 8 * len(chunk))) == chunk
+
+
+def test_range_reads(store):
+    store.put_bytes("r.bin", bytes(range(256)) * 1024)
+    data = bytes(range(256)) * 1024
+    assert b"".join(store.iter_bytes("r.bin")) == data
+    assert b"".join(store.iter_bytes("r.bin", 10, 19)) == data[10:20]
+    assert b"".join(store.iter_bytes("r.bin", len(data) - 5)) == data[-5:]
+
+
+def test_list_and_dirs(store):
+    for key in ("p/x/t/1.txt", "p/x/t/2.txt", "p/x/t/sub/3.txt", "p/y/t/4.txt", "px/5.txt"):
+        store.put_text(key, key)
+    assert sorted(o.key for o in store.list("p/x/t")) == ["p/x/t/1.txt", "p/x/t/2.txt", "p/x/t/sub/3.txt"]
+    assert sorted(o.name for o in store.list("p/x/t", recursive=False)) == ["1.txt", "2.txt"]
+    assert sorted(store.list_dirs("p")) == ["x", "y"]
+    assert store.has_prefix("p/x") and not store.has_prefix("p/z")
+    assert list(store.list("nothing/here")) == []
+
+
+def test_list_past_one_page(store):
+    n = LIST_PAGE_SIZE + 5
+    for i in range(n):
+        store.put_text(f"many/{i:05d}.txt", "x")
+    assert len(list(store.list("many"))) == n
+    assert store.delete_prefix("many") == n
+    assert not store.has_prefix("many")
+
+
+def test_delete(store):
+    store.put_text("d/1.txt", "1")
+    store.put_text("d/2.txt", "2")
+    store.put_text("d/3.txt", "3")
+    assert store.delete("d/1.txt")
+    assert not store.exists("d/1.txt")
+    store.delete("d/1.txt")  # missing keys are not an error
+    assert store.delete_many(["d/2.txt", "d/3.txt"]) == 2
+    assert list(store.list("d")) == []
+
+
+def test_move_prefix(store):
+    store.put_text("proj/old/t/a.txt", "a")
+    store.put_text("proj/old/t/b.txt", "b")
+    store.put_text("proj/older/t/keep.txt", "not part of proj/old")
+    store.move_prefix("proj/old", "proj/new")
+    assert sorted(o.key for o in store.list("proj/new")) == ["proj/new/t/a.txt", "proj/new/t/b.txt"]
+    assert store.read_text("proj/new/t/b.txt") == "b"
+    assert not store.has_prefix("proj/old")
+    assert store.read_text("proj/older/t/keep.txt") == "not part of proj/old"
+
+
+def test_keys_are_scoped_to_prefix(store):
+    store.put_text("s/one.txt", "1")
+    assert store.location("s/one.txt").endswith("s/one.txt")
+    if isinstance(store, S3Storage):
+        raw = store.client.list_objects_v2(Bucket="contract")["Contents"]
+        assert [o["Key"] for o in raw] == ["app/s/one.txt"]
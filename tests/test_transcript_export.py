@@ -0,0 +1,75 @@
+# tests/test_transcript_export.py
+"""Header parsing for transcript exports: Range and Accept-Encoding."""
+import pytest
+
+import transcript_export
+from transcript_export import parse_range, pick_encoding
+
+SIZE = 10
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("bytes=0-4", (0, 4)),
+    ("bytes=5-", (5, 9)),
+    ("bytes=-3", (7, 9)),            # suffix: the last 3 bytes
+    ("bytes=-20", (0, 9)),           # suffix longer than the body
+    ("bytes=3-100", (3, 9)),         # end clamped to the body
+    ("bytes=9-9", (9, 9)),
+    (" bytes=0-1", None),            # not a bytes range
+    (None, None),
+    ("", None),
+    ("items=0-1", None),
+    ("bytes=0-1,3-4", None),         # multi-range: whole body
+    ("bytes=5-3", None),             # invalid range-spec: ignored (RFC 9110)
+    ("bytes=-", None),
+    ("bytes=a-b", None),
+    ("bytes=+1-2", None),
+    ("bytes=1--2", None),
+    ("bytes=²-3", None),             # non-ASCII digit
+])
+def test_parse_range(header, expected):
+    assert parse_range(header, SIZE) == expected
+
+
+@pytest.mark.parametrize("header, size", [
+    ("bytes=10-", SIZE),             # starts past the end
+    ("bytes=10-20", SIZE),
+    ("bytes=-0", SIZE),              # empty suffix
+    ("bytes=0-", 0),                 # nothing to send
+    ("bytes=-5", 0),
+])
+def test_parse_range_unsatisfiable(header, size):
+    with pytest.raises(ValueError):
+        parse_range(header, size)
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("", None),
+    (None, None),
+    ("identity", None),
+    ("br", None),
+    ("gzip", "gzip"),
+    ("GZip", "gzip"),
+    ("deflate, gzip;q=0.5", "gzip"),
+    ("gzip;q=0", None),
+    ("gzip;q=bogus", None),
+    ("*", "gzip"),
+    ("*;q=0", None),
+    ("zstd, gzip", "zstd"),
+    ("gzip, zstd;q=0.1", "zstd"),    # zstd is preferred whenever it's acceptable
+    ("zstd;q=0, gzip", "gzip"),
+])
+def test_pick_encoding(header, expected):
+    if expected == "zstd" and transcript_export.zstandard is None:
+        pytest.skip("zstandard not installed")
+    assert pick_encoding(header) == expected
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("zstd", None),
+    ("zstd, gzip", "gzip"),
+    ("*", "gzip"),
+])
+def test_pick_encoding_without_zstd(monkeypatch, header, expected):
+    monkeypatch.setattr(transcript_export, "zstandard", None)
+    assert pick_encoding(header) == expected
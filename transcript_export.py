@@ -0,0 +1,197 @@
+# transcript_export.py
+import json, re, tarfile, zlib
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from storage import CHUNK_SIZE, Storage
+
+try:
+    import zstandard
+except ImportError:  # optional: zstd is only offered when installed
+    zstandard = None
+
+# Word/segment timing saved next to each transcript so exports can be cut
+# to a time window: meeting_<ts>.txt -> meeting_<ts>.segments.jsonl
+SEGMENTS_SUFFIX = ".segments.jsonl"
+
+
+def segments_path(txt_key: str) -> str:
+    """Sidecar key for a transcript key (meeting_<ts>.txt -> meeting_<ts>.segments.jsonl)."""
+    stem = txt_key[:-4] if txt_key.endswith(".txt") else txt_key
+    return stem + SEGMENTS_SUFFIX
+
+
+def _seconds(value: Any) -> Optional[float]:
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+        except ValueError:
+            return None
+    return None
+
+
+def segment_lines(segments: List[Dict[str, Any]]) -> Iterator[bytes]:
+    """
+    Sidecar body, in CHUNK_SIZE-ish pieces: one JSON line per non-empty
+    segment with its offset (seconds from the first timestamped segment).
+    Uses the relative offset when Recall provides one, otherwise derives it
+    from the absolute start time.
+    """
+    origin = None
+    buf: List[str] = []
+    size = 0
+    for s in segments:
+        text = (s.get("text") or "").strip()
+        if not text:
+            continue
+        offset = s.get("offset")
+        if not isinstance(offset, (int, float)):
+            start = _seconds(s.get("start"))
+            if start is not None and origin is None:
+                origin = start
+            offset = None if start is None else start - origin
+        line = json.dumps({"speaker": s.get("speaker", "Unknown"),
+                           "offset": offset, "text": text}, ensure_ascii=False) + "\n"
+        buf.append(line)
+        size += len(line)
+        if size >= CHUNK_SIZE:
+            yield "".join(buf).encode("utf-8")
+            buf, size = [], 0
+    if buf:
+        yield "".join(buf).encode("utf-8")
+
+
+# ---------- body iterators ----------
+def iter_lines(chunks: Iterable[bytes]) -> Iterator[str]:
+    """Split a byte stream into decoded lines."""
+    rest = b""
+    for chunk in chunks:
+        rest += chunk
+        *lines, rest = rest.split(b"\n")
+        for line in lines:
+            yield line.decode("utf-8")
+    if rest:
+        yield rest.decode("utf-8")
+
+
+def iter_window(store: Storage, seg_key: str, start: Optional[float], end: Optional[float]) -> Iterator[bytes]:
+    """Plaintext lines ("Speaker: text") for segments whose offset lies in [start, end]."""
+    buf: List[str] = []
+    size = 0
+    lines = iter_lines(store.iter_bytes(seg_key))
+    try:
+        for line in lines:
+            if not line.strip():
+                continue
+            seg = json.loads(line)
+            off = seg.get("offset")
+            if off is None:
+                continue
+            if start is not None and off < start:
+                continue
+            if end is not None and off > end:
+                break  # segments are written in time order
+            out = f"{seg.get('speaker', 'Unknown')}: {seg.get('text', '')}\n"
+            buf.append(out)
+            size += len(out)
+            if size >= CHUNK_SIZE:
+                yield "".join(buf).encode("utf-8")
+                buf, size = [], 0
+    finally:
+        lines.close()  # releases the underlying file / HTTP body on early exit
+    if buf:
+        yield "".join(buf).encode("utf-8")
+
+
+def iter_tar(store: Storage, entries: Iterable[Tuple[str, str]]) -> Iterator[bytes]:
+    """
+    Stream an uncompressed tar of (archive name, storage key) pairs without
+    building it in memory. Each member's size is fixed when its header is
+    written; an object that shrinks meanwhile is zero-padded, one that grows
+    is truncated.
+    """
+    for name, key in entries:
+        st = store.stat(key)
+        if st is None:
+            continue
+        info = tarfile.TarInfo(name)
+        info.size, info.mtime, info.mode = st.size, int(st.mtime), 0o644
+        yield info.tobuf(tarfile.PAX_FORMAT, "utf-8", "surrogateescape")
+        sent = 0
+        if st.size:
+            try:
+                for chunk in store.iter_bytes(key, 0, st.size - 1):
+                    chunk = chunk[:st.size - sent]
+                    sent += len(chunk)
+                    yield chunk
+            except FileNotFoundError:
+                pass  # deleted mid-export: pad it out below
+        if sent < st.size:
+            yield b"\0" * (st.size - sent)
+        if st.size % tarfile.BLOCKSIZE:
+            yield b"\0" * (tarfile.BLOCKSIZE - st.size % tarfile.BLOCKSIZE)
+    yield b"\0" * (2 * tarfile.BLOCKSIZE)
+
+
+# ---------- content negotiation ----------
+def pick_encoding(accept_encoding: str) -> Optional[str]:
+    """Best supported coding from an Accept-Encoding header (zstd > gzip), or None."""
+    offered = {}
+    for part in (accept_encoding or "").split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        if name:
+            offered[name.strip().lower()] = q
+    if zstandard is not None and offered.get("zstd", 0) > 0:
+        return "zstd"
+    if offered.get("gzip", 0) > 0 or offered.get("*", 0) > 0:
+        return "gzip"
+    return None
+
+
+def compress(chunks: Iterable[bytes], encoding: Optional[str]) -> Iterator[bytes]:
+    """Incrementally compress a byte stream (gzip or zstd); passthrough for None."""
+    if encoding is None:
+        yield from chunks
+        return
+    if encoding == "zstd":
+        cobj = zstandard.ZstdCompressor(level=3).compressobj()
+    else:
+        cobj = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31 -> gzip container
+    for chunk in chunks:
+        out = cobj.compress(chunk)
+        if out:
+            yield out
+    yield cobj.flush()
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single `bytes=a-b` range. Returns (start, end) inclusive, None when
+    there's no usable Range header, and raises ValueError if unsatisfiable.
+    Multi-range requests are answered with the full body, and so are invalid
+    ones (e.g. `bytes=5-3`), which RFC 9110 says to ignore.
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    m = re.fullmatch(r"(\d*)-(\d*)", header[6:].strip(), re.ASCII)
+    if not m or not any(m.groups()):
+        return None  # malformed: ignore it and send the whole body
+    start = int(m[1]) if m[1] else None
+    end = int(m[2]) if m[2] else None
+    if start is None:
+        if end == 0 or size == 0:
+            raise ValueError("range not satisfiable")
+        return max(0, size - end), size - 1  # suffix range: last `end` bytes
+    if end is not None and end < start:
+        return None
+    if start >= size:
+        raise ValueError("range not satisfiable")
+    return start, size - 1 if end is None else min(end, size - 1)
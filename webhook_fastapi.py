@@ -1,17 +1,31 @@
 # webhook_fastapi.py
-import os, time, requests, shutil
-from pathlib import Path
-from typing import Any, Dict, List, Optional
-from fastapi import FastAPI, Request, HTTPException, Body
-from fastapi.responses import JSONResponse
+import hashlib, os, time, threading, uuid
+from fnmatch import fnmatch
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from email.utils import formatdate, parsedate_to_datetime
+from urllib.parse import quote
+from fastapi import FastAPI, Request, HTTPException, Body, BackgroundTasks, Query, UploadFile, File, Form
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 from dotenv import load_dotenv
 from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
 from contextlib import asynccontextmanager
 
-from cache_manager import cleanup_cache, save_summary, get_summary
+from bot_dispatcher import get_batch, load_meetings, resume_batches, start_batch, stop_batches, wait_batch
+from batch_summarizer import forget_job, get_job, is_running, rename_job, resume_jobs, start_job, stop_jobs
+from cache_manager import (
+    cleanup_cache, save_summary, get_summary, summary_key,
+    purge_project, rename_project_index, rekey_entries,
+)
 from create_bot import req_bot
-from summarizer import run_summary
+from ingestion import RETRY_AFTER_SEC, IngestJob, IngestQueueFull, IngestionPipeline
+from metrics import HTTP_SECONDS, new_trace_id, render_metrics, span, trace_id_var
+from storage import ObjectInfo, get_storage, invalid_project_name, listing_version
+from summarizer import run_summary, warm_up
+from transcript_export import (
+    compress, iter_tar, iter_window, parse_range, pick_encoding, segments_path,
+)
 
 # --- timezone ---
 IST = ZoneInfo("Asia/Kolkata")
@@ -21,171 +35,272 @@ REGION  = os.getenv("RECALLAI_REGION", "us-west-2")
 API_KEY = os.getenv("RECALLAI_API_KEY", "")
 SECRET  = os.getenv("WEBHOOK_TOKEN", "")
 
-BASE = f"https://{REGION}.recall.ai/api/v1"
+# RECALLAI_BASE_URL lets benchmarks point at a local stand-in server
+BASE = os.getenv("RECALLAI_BASE_URL") or f"https://{REGION}.recall.ai/api/v1"
 HEAD = {"Authorization": f"Token {API_KEY}"} if API_KEY else {}
 
-ROOT          = Path.cwd()
-PROJECTS_ROOT = ROOT / "transcripts_projects"
-PROJECTS_ROOT.mkdir(exist_ok=True)
-
-# Polling parameters
-MAX_WAIT_SEC   = 300
-POLL_START_SEC = 2
-POLL_MAX_SEC   = 15
+# Key prefixes in the storage backend (STORAGE_BACKEND, see storage.py).
+# Layout: transcripts_projects/<project>/transcripts/meeting_<ts>.txt
+PROJECTS_ROOT = "transcripts_projects"
+# Deleted projects are renamed in here (instant on local disk) and reclaimed in the background.
+# Object stores can't rename, so they delete in place and leave a tombstone
+# here, <project>.deleted, until the last object is gone.
+TRASH_DIR     = f"{PROJECTS_ROOT}/.trash"
+TOMBSTONE_EXT = ".deleted"
 
 # Auto-delete cutoff
 RETENTION_DAYS = 15
+# Listing endpoints run retention cleanup at most this often
+CLEANUP_INTERVAL_SEC = int(os.getenv("CLEANUP_INTERVAL_SEC", "3600"))
+
+# When to load CrewAI + the LLM client: "background" (after the server starts
+# accepting traffic), "eager" (before), or "off" (on the first summary)
+LLM_WARMUP = os.getenv("LLM_WARMUP", "background").strip().lower()
 
 # ---------- helpers ----------
-def ts_strings() -> tuple[str, str]:
-    now = datetime.now(IST)
+def ts_strings(at: Optional[datetime] = None) -> tuple[str, str]:
+    now = at.astimezone(IST) if at else datetime.now(IST)
     return now.strftime("%d/%m/%Y at %H:%M"), now.strftime("%d-%m-%Y at %H.%M")
 
-def normalize_segments(tj: Any) -> List[Dict[str, Any]]:
-    out: List[Dict[str, Any]] = []
-    if isinstance(tj, dict):
-        for k in ("segments", "results", "utterances", "data"):
-            v = tj.get(k)
-            if isinstance(v, list):
-                for seg in v:
-                    out.append(_map_segment(seg))
-                return out
-    if isinstance(tj, list):
-        for entry in tj:
-            participant = entry.get("participant") or {}
-            name = participant.get("name") or participant.get("id") or "Unknown"
-            for w in entry.get("words", []):
-                out.append({
-                    "speaker": name,
-                    "start": w.get("start_timestamp", {}).get("absolute"),
-                    "end": w.get("end_timestamp", {}).get("absolute"),
-                    "text": w.get("text", "")
-                })
-        return out
-    return out
-
-def _map_segment(seg: Dict[str, Any]) -> Dict[str, Any]:
-    p = seg.get("participant") or seg.get("speaker") or {}
-    if isinstance(p, dict):
-        name = p.get("name") or p.get("display_name") or p.get("id")
-    else:
-        name = str(p)
-    return {
-        "speaker": name or "Unknown",
-        "start": seg.get("start"),
-        "end": seg.get("end"),
-        "text": seg.get("text") or seg.get("utterance") or ""
-    }
+def project_key(project: str) -> str:
+    return f"{PROJECTS_ROOT}/{project}"
 
-def as_plaintext(segments: List[Dict[str, Any]]) -> str:
-    return "\n".join(
-        f"{s.get('speaker','Unknown')}: {(s.get('text') or '').strip()}"
-        for s in segments if (s.get('text') or '').strip()
-    )
+def transcripts_key(project: str) -> str:
+    return f"{PROJECTS_ROOT}/{project}/transcripts"
+
+def tombstone_key(project: str) -> str:
+    return f"{TRASH_DIR}/{project}{TOMBSTONE_EXT}"
+
+def deleting_projects() -> set:
+    """Projects being deleted in place (object stores); hidden while their objects are removed."""
+    return {o.name[:-len(TOMBSTONE_EXT)] for o in get_storage().list(TRASH_DIR, recursive=False)
+            if o.name.endswith(TOMBSTONE_EXT)}
+
+def is_deleting(project: str) -> bool:
+    return get_storage().exists(tombstone_key(project))
+
+def project_exists(project: str) -> bool:
+    return get_storage().has_prefix(project_key(project)) and not is_deleting(project)
+
+def ensure_project(project: str) -> str:
+    get_storage().ensure_prefix(transcripts_key(project))
+    return project_key(project)
 
-def get_bot_media_shortcuts(bot_id: str) -> Dict[str, Any]:
-    if not (API_KEY and bot_id): return {}
-    r = requests.get(f"{BASE}/bot/{bot_id}/", headers=HEAD, timeout=30)
-    r.raise_for_status()
-    info = r.json()
-    return (info.get("recordings") or {}).get("media_shortcuts") or {}
-
-def get_transcript_url_by_id(transcript_id: str) -> Optional[str]:
-    if not (API_KEY and transcript_id): return None
-    r = requests.get(f"{BASE}/transcript/{transcript_id}/", headers=HEAD, timeout=30)
-    r.raise_for_status()
-    obj = r.json() or {}
-    data = obj.get("data") if isinstance(obj, dict) else None
-    if isinstance(data, dict) and "download_url" in data:
-        return data["download_url"]
-    return obj.get("download_url")
-
-def find_transcript_url(bot_id: Optional[str], transcript_id: Optional[str]) -> Optional[str]:
-    if transcript_id:
-        url = get_transcript_url_by_id(transcript_id)
-        if url: return url
-    if bot_id:
-        media = get_bot_media_shortcuts(bot_id)
-        t = (media.get("transcript") or {}).get("data", {})
-        if t.get("download_url"):
-            return t["download_url"]
-    return None
-
-def wait_for_transcript_url(bot_id: Optional[str], transcript_id: Optional[str]) -> Optional[str]:
-    deadline = time.time() + MAX_WAIT_SEC
-    delay = POLL_START_SEC
-    url = find_transcript_url(bot_id, transcript_id)
-    while not url and time.time() < deadline:
-        time.sleep(delay)
-        delay = min(int(delay * 1.5) or 1, POLL_MAX_SEC)
-        url = find_transcript_url(bot_id, transcript_id)
-    return url
-
-def ensure_project(project: str) -> Path:
-    proj_dir = PROJECTS_ROOT / project
-    (proj_dir / "transcripts").mkdir(parents=True, exist_ok=True)
-    return proj_dir
-
-def invalid_project_name(name: str) -> bool:
-    """Basic sanitation to avoid path traversal / invalid FS chars."""
-    if not name or name.strip() == "":
-        return True
-    bad_chars = set('\\/:*?"<>|')
-    return any(c in bad_chars for c in name) or ".." in name or name.startswith(".")
-
-def save_txt_from_url(url: str, project: str) -> str:
-    r = requests.get(url, timeout=120)
-    r.raise_for_status()
-    human, safe = ts_strings()
-
-    tj = r.json()
-    segments = normalize_segments(tj)
-    txt_body = as_plaintext(segments)
-
-    proj_dir = ensure_project(project)
-    txt_path = proj_dir / "transcripts" / f"meeting_{safe}.txt"
-
-    with open(txt_path, "w", encoding="utf-8") as f:
-        f.write(f"Meeting transcript — {human} (Asia/Kolkata)\n")
-        f.write("-" * 60 + "\n")
-        f.write(txt_body)
-
-    print("[saved txt]", txt_path)
-    return str(txt_path)
+def read_transcript(key: str) -> str:
+    with span("read_transcript"):
+        return get_storage().read_text(key)
+
+def store_transcript(project: str, txt_body: str, segments_jsonl: bytes, tag: str,
+                     at: Optional[datetime] = None) -> str:
+    """
+    Write one ingested transcript and its timing sidecar. Returns its location.
+    `tag` (Recall's transcript or bot id) makes the name unique, so replicas
+    ingesting meetings of one project in the same minute never overwrite each
+    other. `at` (when the webhook arrived) dates the name, so a replayed job
+    rewrites the same file instead of adding a copy.
+    """
+    if is_deleting(project):
+        # Fails the ingest job (kept in ingest_jobs/failed/) instead of reviving the project
+        raise RuntimeError(f"project '{project}' is being deleted")
+    human, safe = ts_strings(at)
+    store = get_storage()
+    txt_key = f"{transcripts_key(project)}/meeting_{safe} ({tag}).txt"
+    header = f"Meeting transcript — {human} (Asia/Kolkata)\n" + "-" * 60 + "\n"
+    with span("write_transcript"):
+        # Sidecar first, so a listed transcript always has its timing data
+        store.put_bytes(segments_path(txt_key), segments_jsonl)
+        store.put_text(txt_key, header + txt_body)
+
+    location = store.location(txt_key)
+    print("[saved txt]", location)
+    return location
+
+def list_transcript_objects(tkey: str) -> List[ObjectInfo]:
+    return [o for o in get_storage().list(tkey, recursive=False) if fnmatch(o.name, "meeting_*.txt")]
 
 def cleanup_old_transcripts(days: int = RETENTION_DAYS):
-    cutoff = datetime.now(IST) - timedelta(days=days)
-    for proj in PROJECTS_ROOT.iterdir():
-        if not proj.is_dir(): continue
-        tdir = proj / "transcripts"
-        for f in tdir.glob("meeting_*.txt"):
-            if datetime.fromtimestamp(f.stat().st_mtime, IST) < cutoff:
-                f.unlink()
-                print(f"[deleted old transcript] {f}")
-
-def resolve_project_from_bot(bot_id: Optional[str], fallback: str = "default") -> str:
+    cutoff = (datetime.now(IST) - timedelta(days=days)).timestamp()
+    store = get_storage()
+    for project in store.list_dirs(PROJECTS_ROOT):
+        if project.startswith("."): continue
+        old = [o.key for o in list_transcript_objects(transcripts_key(project)) if o.mtime < cutoff]
+        if not old: continue
+        store.delete_many(old + [segments_path(k) for k in old])
+        for k in old:
+            print(f"[deleted old transcript] {k}")
+
+_purge_lock = threading.Lock()
+
+def purge_tombstones():
     """
-    If possible, fetch the bot and read metadata.project.
+    Reclaim every tombstoned project: trashed directories, and in-place
+    deletes (object stores) that a restart interrupted. Safe to call concurrently.
     """
-    project = fallback or "default"
-    if not bot_id:
-        return project
+    if not _purge_lock.acquire(blocking=False):
+        return  # another purge is already draining the trash
     try:
-        r = requests.get(f"{BASE}/bot/{bot_id}/", headers=HEAD, timeout=30)
-        r.raise_for_status()
-        bot_info = r.json() or {}
-        meta = bot_info.get("metadata") or {}
-        p = (meta.get("project") or "").strip()
-        if p:
-            project = p
+        store = get_storage()
+        for tomb in store.list_dirs(TRASH_DIR):
+            t0 = time.time()
+            n = store.delete_prefix(f"{TRASH_DIR}/{tomb}")
+            print(f"[purge] reclaimed {tomb} ({n} files) in {time.time() - t0:.1f}s")
+        for project in deleting_projects():
+            purge_in_place(project)
+    finally:
+        _purge_lock.release()
+
+def purge_in_place(project: str, passes: int = 3):
+    """
+    Delete a tombstoned project's objects, then the tombstone (kept on
+    failure, so startup retries). Another pass catches a transcript whose
+    write was already under way when the tombstone appeared.
+    """
+    store = get_storage()
+    t0, n = time.time(), 0
+    for _ in range(passes):
+        n += store.delete_prefix(project_key(project))
+        if not any(True for _ in store.list(project_key(project))):
+            break
+    store.delete(tombstone_key(project))
+    print(f"[purge] reclaimed {project} ({n} files) in {time.time() - t0:.1f}s")
+
+def purge_project_data(project: str, in_place: bool = False):
+    """
+    Background part of a delete: drop cached summaries, then reclaim files,
+    either in place (object stores, under a tombstone) or from the trash.
+    """
+    try:
+        n = purge_project(project)
+        print(f"[purge] {project}: removed {n} cached summaries")
     except Exception as e:
-        print("[webhook] could not fetch bot metadata:", e)
-    return project
+        print(f"[purge] {project}: cache purge failed:", e)
+    if in_place:
+        try:
+            purge_in_place(project)
+        except Exception as e:
+            print(f"[purge] {project}: delete failed:", e)
+    purge_tombstones()
+
+# Projects with a background rename (object stores) in progress
+_moving: set = set()
+_moving_lock = threading.Lock()
+
+def move_project_data(project: str, new_name: str, passes: int = 3):
+    """
+    Background part of a rename on object stores: copy every object to the
+    new prefix, then delete the originals. Transcripts ingested into the old
+    name while copying are picked up by another pass.
+    """
+    store = get_storage()
+    try:
+        t0 = time.time()
+        for _ in range(passes):
+            store.move_prefix(project_key(project), project_key(new_name))
+            if not store.has_prefix(project_key(project)):
+                break
+        print(f"[rename] {project} -> {new_name}: moved in {time.time() - t0:.1f}s")
+    except Exception as e:
+        print(f"[rename] {project} -> {new_name}: move failed:", e)
+    finally:
+        _listing_cache.pop(transcripts_key(new_name), None)
+        with _moving_lock:
+            _moving.difference_update((project, new_name))
+
+def rekey_project_data(keys: List[str], project: str):
+    try:
+        n = rekey_entries(keys, project)
+        print(f"[rename] {project}: re-keyed {n} cached summaries")
+    except Exception as e:
+        print(f"[rename] {project}: re-key failed:", e)
+
+_last_cleanup = 0.0
+
+def maybe_cleanup_old_transcripts():
+    """cleanup_old_transcripts, throttled to once per CLEANUP_INTERVAL_SEC."""
+    global _last_cleanup
+    if time.time() - _last_cleanup < CLEANUP_INTERVAL_SEC:
+        return
+    _last_cleanup = time.time()
+    cleanup_old_transcripts()
+
+# ---------- conditional responses (ETag / Last-Modified) ----------
+def not_modified(req: Request, etag: str, last_modified: float) -> bool:
+    inm = req.headers.get("if-none-match")
+    if inm:
+        return inm.strip() == "*" or etag in [t.strip() for t in inm.split(",")]
+    ims = req.headers.get("if-modified-since")
+    if ims:
+        try:
+            return int(last_modified) <= parsedate_to_datetime(ims).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+def conditional_json(req: Request, version: str, last_modified: float, build: Callable[[], Any]) -> Response:
+    """
+    Return 304 if the client's copy matches `version`, otherwise the JSON from build().
+    build() is only called on a miss, so unchanged data costs no filesystem work.
+    """
+    etag = f'W/"{version}"'
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(last_modified, usegmt=True),
+        "Cache-Control": "no-cache",
+    }
+    if not_modified(req, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(build(), headers=headers)
+
+# Listing cache: transcripts prefix -> (version, listing). Adding, removing or
+# renaming a transcript changes the prefix version, which invalidates it.
+_listing_cache: Dict[str, Tuple[str, List[Dict[str, str]]]] = {}
+
+def transcripts_version(tkey: str) -> Tuple[str, float, Optional[List[ObjectInfo]]]:
+    """
+    (version, last_modified, listed) for a transcripts prefix. Local disk
+    answers from the directory mtime; object stores have to list, and
+    `listed` carries that result so the caller doesn't list twice.
+    """
+    ver = get_storage().version(tkey)
+    if ver is not None:
+        return ver[0], ver[1], None
+    listed = list_transcript_objects(tkey)
+    version, last_modified = listing_version(listed)
+    return version, last_modified, listed
+
+def transcript_listing(tkey: str, version: str, objects: Optional[List[ObjectInfo]] = None) -> List[Dict[str, str]]:
+    hit = _listing_cache.get(tkey)
+    if hit and hit[0] == version:
+        return hit[1]
+    if objects is None:
+        objects = list_transcript_objects(tkey)
+    files = sorted(objects, key=lambda o: o.mtime, reverse=True)
+    listing = [{"label": o.name[:-len(".txt")].replace("meeting_",""), "filename": o.name} for o in files]
+    _listing_cache[tkey] = (version, listing)
+    return listing
+
+# ---------- ingestion ----------
+# Webhooks are queued here; pool sizes come from INGEST_* env vars (see ingestion.py)
+ingest = IngestionPipeline(write=store_transcript, recall_base=BASE, recall_headers=HEAD)
 
 # ---------- lifespan (startup/shutdown) ----------
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    # Startup
+def startup_housekeeping():
+    """Slow startup work, run off the event loop so /health answers right away."""
+    # Unfinished jobs whose owner is gone; ones still heartbeating (another
+    # replica, or this one's previous process until its lease runs out) are
+    # picked up later by the job heartbeat if their owner stops
+    try:
+        n = resume_jobs()
+        if n:
+            print(f"[startup] resumed {n} batch summarize job(s)")
+    except Exception as e:
+        print("[startup] resume_jobs failed:", e)
+    try:
+        n = resume_batches()
+        if n:
+            print(f"[startup] resumed {n} bot dispatch batch(es)")
+    except Exception as e:
+        print("[startup] resume_batches failed:", e)
     try:
         cleanup_cache()
     except Exception as e:
@@ -194,7 +309,29 @@ async def lifespan(app: FastAPI):
         cleanup_old_transcripts()
     except Exception as e:
         print("[startup] cleanup_old_transcripts failed:", e)
+    try:
+        purge_tombstones()  # leftovers from deletes interrupted by a restart
+    except Exception as e:
+        print("[startup] purge_tombstones failed:", e)
+    if LLM_WARMUP == "background":
+        try:
+            warm_up()
+            print("[startup] LLM stack warmed up")
+        except Exception as e:
+            print("[startup] warm_up failed:", e)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Startup
+    if LLM_WARMUP == "eager":
+        warm_up()
+    await ingest.start()
+    threading.Thread(target=startup_housekeeping, name="startup-housekeeping", daemon=True).start()
     yield
+    # Shutdown: hand unfinished work to the next process (or another replica)
+    await ingest.stop()
+    await run_in_threadpool(stop_batches)
+    await run_in_threadpool(stop_jobs)
 
 # Create FastAPI app with lifespan handler
 app = FastAPI(lifespan=lifespan)
@@ -213,47 +350,106 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# ---------- tracing / metrics ----------
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    # Clients may pass their own X-Trace-Id; otherwise we mint one
+    trace_id = request.headers.get("X-Trace-Id") or new_trace_id()
+    token = trace_id_var.set(trace_id)
+    t0 = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        trace_id_var.reset(token)
+    route = request.scope.get("route")
+    HTTP_SECONDS.observe(time.perf_counter() - t0,
+                         method=request.method,
+                         route=getattr(route, "path", "unmatched"))
+    response.headers["X-Trace-Id"] = trace_id
+    return response
+
 # ---------- routes ----------
 @app.get("/health")
 def health():
     return {"ok": True}
 
+@app.get("/metrics")
+def metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
 # ---- Project CRUD ----
 @app.post("/create_project")
 def create_project(payload: dict = Body(...)):
     project_name = (payload.get("project_name") or "").strip()
     if invalid_project_name(project_name):
         return {"error": "invalid project_name"}
-    proj_dir = ensure_project(project_name)
-    return {"ok": True, "project": project_name, "path": str(proj_dir)}
+    if is_deleting(project_name):
+        return {"error": f"project '{project_name}' is being deleted"}
+    proj_key = ensure_project(project_name)
+    return {"ok": True, "project": project_name, "path": get_storage().location(proj_key)}
 
 @app.patch("/projects/{project}")
-def rename_project(project: str, payload: dict = Body(...)):
+def rename_project(project: str, background: BackgroundTasks, payload: dict = Body(...)):
     if invalid_project_name(project):
         return {"error": "invalid current project name"}
     new_name = (payload.get("new_name") or "").strip()
     if invalid_project_name(new_name):
         return {"error": "invalid new_name"}
-    old_dir = PROJECTS_ROOT / project
-    if not old_dir.exists() or not old_dir.is_dir():
+    store = get_storage()
+    if not project_exists(project):
         return {"error": f"project '{project}' not found"}
-    new_dir = PROJECTS_ROOT / new_name
-    if new_dir.exists():
+    if store.has_prefix(project_key(new_name)):
         return {"error": f"project '{new_name}' already exists"}
-    old_dir.rename(new_dir)
-    return {"ok": True, "old": project, "new": new_name, "path": str(new_dir)}
+    if is_deleting(new_name):
+        return {"error": f"project '{new_name}' is being deleted"}
+    if is_running(project):
+        return {"error": f"project '{project}' has a batch summarize job running"}
+    with _moving_lock:
+        if project in _moving or new_name in _moving:
+            return {"error": f"project '{project}' or '{new_name}' is being renamed"}
+        _moving.update((project, new_name))
+    moving = not store.cheap_rename
+    if moving:
+        # Object stores copy every object; do that after responding, like deletes
+        background.add_task(move_project_data, project, new_name)
+    else:
+        try:
+            store.move_prefix(project_key(project), project_key(new_name))
+        finally:
+            with _moving_lock:
+                _moving.difference_update((project, new_name))
+    _listing_cache.pop(transcripts_key(project), None)
+    # Index and job state move now; rewriting each cached entry can wait
+    keys = rename_project_index(project, new_name)
+    rename_job(project, new_name, transcripts_key(new_name))
+    if keys:
+        background.add_task(rekey_project_data, keys, new_name)
+    return {"ok": True, "old": project, "new": new_name, "path": store.location(project_key(new_name)),
+            "moving": moving}
 
 @app.delete("/projects/{project}")
-def delete_project(project: str, payload: dict = Body(None)):
+def delete_project(project: str, background: BackgroundTasks, payload: dict = Body(None)):
     if invalid_project_name(project):
         return {"error": "invalid project name"}
     confirm = bool(isinstance(payload, dict) and payload.get("confirm"))
     if not confirm:
         return {"error": "set 'confirm': true to delete project"}
-    proj_dir = PROJECTS_ROOT / project
-    if not proj_dir.exists() or not proj_dir.is_dir():
+    store = get_storage()
+    if not project_exists(project):
         return {"error": f"project '{project}' not found"}
-    shutil.rmtree(proj_dir)
+    if project in _moving:
+        return {"error": f"project '{project}' is being renamed"}
+    if store.cheap_rename:
+        # Tombstone: a rename is instant no matter how many transcripts there are
+        store.move_prefix(project_key(project), f"{TRASH_DIR}/{project}.{uuid.uuid4().hex[:8]}")
+        background.add_task(purge_project_data, project)
+    else:
+        # Object stores can't rename; tombstone the project (hidden from now on,
+        # and finished at startup if we restart first), then delete in place
+        store.put_text(tombstone_key(project), datetime.now(IST).isoformat())
+        background.add_task(purge_project_data, project, True)
+    _listing_cache.pop(transcripts_key(project), None)
+    forget_job(project)
     return {"ok": True, "deleted": project}
 
 # ---- Webhook ----
@@ -276,23 +472,30 @@ async def recall_webhook(req: Request):
     download_url  = data.get("download_url")
     bot_id        = data.get("bot_id") or (data.get("bot") or {}).get("id")
     transcript_id = data.get("transcript_id") or (data.get("transcript") or {}).get("id")
+    if not (download_url or bot_id or transcript_id):
+        return {"ok": True, "note": "no transcript in event"}
+
+    # Project: ?project=... here, else bot.metadata.project (resolved by the pipeline), else "default"
+    project = (req.query_params.get("project") or "").strip() or None
+    if project and invalid_project_name(project):
+        return JSONResponse({"ok": False, "error": "invalid project name"}, status_code=400)
+
+    # Fetching, parsing and writing happen in the ingestion pipeline; the job is
+    # stored before we answer, so an accepted webhook survives a restart
+    job = IngestJob(id=uuid.uuid4().hex, project=project, bot_id=bot_id,
+                    transcript_id=transcript_id, download_url=download_url,
+                    trace_id=trace_id_var.get())
+    try:
+        await ingest.submit(job)
+    except IngestQueueFull as e:
+        return JSONResponse({"ok": False, "error": str(e)}, status_code=503,
+                            headers={"Retry-After": str(RETRY_AFTER_SEC)})
+    return JSONResponse({"ok": True, "queued": True, "ingest_id": job.id, "project": project},
+                        status_code=202)
 
-    # Decide project: ?project=... OR bot.metadata.project OR "default"
-    project = (req.query_params.get("project") or "").strip()
-    if not project or project == "default":
-        project = resolve_project_from_bot(bot_id, fallback="default")
-
-    # Save via direct URL if present; else poll
-    if download_url:
-        txt_path = save_txt_from_url(download_url, project)
-        return {"ok": True, "project": project, "txt": txt_path, "source": "direct"}
-
-    url = wait_for_transcript_url(bot_id, transcript_id)
-    if not url:
-        return JSONResponse({"ok": True, "note": "transcript not ready yet"}, status_code=200)
-
-    txt_path = save_txt_from_url(url, project)
-    return {"ok": True, "project": project, "txt": txt_path, "source": "polled"}
+@app.get("/ingest/status")
+def ingest_status():
+    return ingest.stats()
 
 # ---- Bot ----
 @app.post("/start_bot")
@@ -303,6 +506,8 @@ def start_bot(payload: dict = Body(...)):
 
     if not meet_url:
         return {"error": "meeting_url is required"}
+    if invalid_project_name(project):
+        return {"error": "invalid project_name"}
 
     try:
         # pass project into req_bot so it's stored in bot.metadata
@@ -311,23 +516,181 @@ def start_bot(payload: dict = Body(...)):
     except Exception as e:
         return {"ok": False, "error": str(e)}
 
+@app.post("/bots/batch")
+def start_bot_batch(payload: dict = Body(...), wait: bool = False):
+    """
+    Dispatch bots for many meetings at once. Body:
+    {"meetings": [{"meeting_url", "project_name"?, "bot_name"?, "start_time"?} or "<meeting url>", ...],
+     "project_name"?: default project, "bot_name"?: default bot name}
+    Malformed entries come back as "invalid" items; the rest are dispatched.
+    With ?wait=true the response carries every meeting's outcome.
+    """
+    meetings = payload.get("meetings")
+    if not isinstance(meetings, list) or not meetings:
+        return {"error": "meetings must be a non-empty list"}
+    project, bot_name = payload.get("project_name") or "default", payload.get("bot_name") or "SummarizerBot"
+    if not isinstance(project, str) or not isinstance(bot_name, str):
+        return {"error": "project_name and bot_name must be strings"}
+    project, bot_name = project.strip(), bot_name.strip()
+    if invalid_project_name(project):
+        return {"error": "invalid project_name"}
+    batch = start_batch(meetings, project=project, bot_name=bot_name)
+    return wait_batch(batch["batch_id"]) if wait else batch
+
+@app.post("/bots/batch/upload")
+async def upload_bot_batch(
+    file: UploadFile = File(...),
+    project_name: str = Form("default"),
+    bot_name: str = Form("SummarizerBot"),
+    wait: bool = False,
+):
+    """Same as /bots/batch, from an uploaded CSV (meeting_url,project_name,bot_name,start_time) or .ics file."""
+    content = (await file.read()).decode("utf-8-sig", errors="replace")
+    meetings = load_meetings(content, filename=file.filename or "")
+    if not meetings:
+        return {"error": "no meetings found in upload"}
+    if invalid_project_name(project_name.strip() or "default"):
+        return {"error": "invalid project_name"}
+    batch = start_batch(meetings, project=project_name.strip() or "default",
+                        bot_name=bot_name.strip() or "SummarizerBot")
+    if wait:
+        return await run_in_threadpool(wait_batch, batch["batch_id"])
+    return batch
+
+@app.get("/bots/batch/{batch_id}")
+def bot_batch_status(batch_id: str):
+    batch = get_batch(batch_id) if batch_id.isalnum() else None
+    if not batch:
+        return {"error": f"batch '{batch_id}' not found"}
+    return batch
+
 # ---- Listing ----
 @app.get("/projects")
-def list_projects():
-    cleanup_old_transcripts()
-    projects = [p.name for p in PROJECTS_ROOT.iterdir() if p.is_dir()]
-    return {"projects": projects}
+def list_projects(req: Request):
+    maybe_cleanup_old_transcripts()
+    store = get_storage()
+    def names():
+        deleting = deleting_projects()
+        return [p for p in store.list_dirs(PROJECTS_ROOT) if not p.startswith(".") and p not in deleting]
+    ver = store.version(PROJECTS_ROOT)
+    if ver is None:
+        # No directory mtime on object stores: version the names themselves
+        projects = names()
+        ver = hashlib.sha1("\0".join(sorted(projects)).encode("utf-8")).hexdigest()[:16], time.time()
+        return conditional_json(req, ver[0], ver[1], lambda: {"projects": projects})
+    return conditional_json(req, ver[0], ver[1], lambda: {"projects": names()})
 
 @app.get("/transcripts/{project}")
-def list_transcripts(project: str):
-    proj_dir = ensure_project(project)
-    files = sorted(
-        (proj_dir / "transcripts").glob("meeting_*.txt"),
-        key=lambda p: p.stat().st_mtime,
-        reverse=True
+def list_transcripts(project: str, req: Request):
+    if invalid_project_name(project):
+        return {"error": "invalid project name"}
+    if is_deleting(project):
+        return {"error": f"project '{project}' not found"}
+    ensure_project(project)
+    tkey = transcripts_key(project)
+    version, last_modified, listed = transcripts_version(tkey)
+    return conditional_json(
+        req, version, last_modified,
+        lambda: {"project": project, "transcripts": transcript_listing(tkey, version, listed)},
+    )
+
+@app.get("/transcripts/{project}/{transcript_file}")
+def export_transcript(
+    project: str,
+    transcript_file: str,
+    req: Request,
+    from_sec: Optional[float] = Query(None, alias="from", ge=0),
+    to_sec: Optional[float] = Query(None, alias="to", ge=0),
+):
+    """
+    Stream one transcript. Supports a single HTTP Range (always served
+    uncompressed), gzip/zstd via Accept-Encoding otherwise, and ?from=&to= (seconds into the meeting)
+    to export just a time window.
+    """
+    if invalid_project_name(project) or invalid_project_name(transcript_file):
+        return JSONResponse({"error": "invalid project or transcript name"}, status_code=400)
+    store = get_storage()
+    tkey = f"{transcripts_key(project)}/{transcript_file}"
+    info = store.stat(tkey)
+    if info is None:
+        return JSONResponse({"error": f"{transcript_file} not found in project {project}"}, status_code=404)
+
+    # A Range refers to the stored bytes, so a ranged request is always served as identity
+    ranged = "range" in req.headers and from_sec is None and to_sec is None
+    encoding = None if ranged else pick_encoding(req.headers.get("accept-encoding", ""))
+    headers = {"Vary": "Accept-Encoding"}
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    media_type = "text/plain; charset=utf-8"
+
+    if from_sec is not None or to_sec is not None:
+        seg_key = segments_path(tkey)
+        if not store.exists(seg_key):
+            return JSONResponse({"error": "no timing data for this transcript; time window unavailable"},
+                                status_code=422)
+        return StreamingResponse(compress(iter_window(store, seg_key, from_sec, to_sec), encoding),
+                                 media_type=media_type, headers=headers)
+
+    # Strong validators are per representation, so each content-coding gets its own ETag
+    headers["ETag"] = f'"{info.etag}-{encoding}"' if encoding else f'"{info.etag}"'
+    headers["Last-Modified"] = formatdate(info.mtime, usegmt=True)
+    headers["Accept-Ranges"] = "bytes"
+    if not_modified(req, headers["ETag"], info.mtime):
+        return Response(status_code=304, headers=headers)
+
+    if encoding:
+        return StreamingResponse(compress(store.iter_bytes(tkey), encoding), media_type=media_type, headers=headers)
+
+    try:
+        rng = parse_range(req.headers.get("range"), info.size)
+    except ValueError:
+        return Response(status_code=416, headers={"Content-Range": f"bytes */{info.size}"})
+    if rng is None:
+        headers["Content-Length"] = str(info.size)
+        return StreamingResponse(store.iter_bytes(tkey), media_type=media_type, headers=headers)
+    start, end = rng
+    headers["Content-Range"] = f"bytes {start}-{end}/{info.size}"
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(store.iter_bytes(tkey, start, end), status_code=206,
+                             media_type=media_type, headers=headers)
+
+@app.get("/projects/{project}/export")
+def export_project(project: str, fmt: str = Query("tar.gz", alias="format", pattern=r"^tar(\.gz|\.zst)?$")):
+    """Stream every transcript in a project as one tar archive (optionally gzip/zstd)."""
+    if invalid_project_name(project):
+        return JSONResponse({"error": "invalid project name"}, status_code=400)
+    store = get_storage()
+    tkey = transcripts_key(project)
+    if not store.has_prefix(tkey) or is_deleting(project):
+        return JSONResponse({"error": f"project '{project}' not found"}, status_code=404)
+    encoding = {"tar": None, "tar.gz": "gzip", "tar.zst": "zstd"}[fmt]
+    if encoding == "zstd" and pick_encoding("zstd") != "zstd":
+        return JSONResponse({"error": "zstd support is not installed"}, status_code=400)
+    # Only names are listed up front; objects are read one at a time as the archive streams
+    names = sorted(o.name for o in list_transcript_objects(tkey))
+    entries = ((f"{project}/{name}", f"{tkey}/{name}") for name in names)
+    return StreamingResponse(
+        compress(iter_tar(store, entries), encoding),
+        media_type="application/x-tar" if fmt == "tar" else "application/octet-stream",
+        headers={"Content-Disposition": f"attachment; filename*=UTF-8''{quote(project)}.{fmt}"},
     )
-    return {"project": project,
-            "transcripts": [{"label": f.stem.replace("meeting_",""), "filename": f.name} for f in files]}
+
+@app.get("/summaries/{project}/{transcript_file}")
+def cached_summary(project: str, transcript_file: str, req: Request):
+    """Cached summary for a transcript (never runs the LLM; use POST /summarize for that)."""
+    if invalid_project_name(project) or invalid_project_name(transcript_file):
+        return {"error": "invalid project or transcript name"}
+    try:
+        text = read_transcript(f"{transcripts_key(project)}/{transcript_file}")
+    except FileNotFoundError:
+        return JSONResponse({"error": f"{transcript_file} not found in project {project}"}, status_code=404)
+    info = get_storage().stat(summary_key(text))
+    if info is None:
+        return JSONResponse({"error": "summary not cached"}, status_code=404)
+    def build():
+        summary = get_summary(text)
+        return {"summary": summary, "cached": True} if summary else {"error": "summary not cached"}
+    return conditional_json(req, f"{info.name[:-len('.json')]}-{info.etag}", info.mtime, build)
 
 # ---- Summarization ----
 @app.post("/summarize")
@@ -335,21 +698,38 @@ async def summarize(req: Request):
     data = await req.json()
     project = (data.get("project_name") or "default").strip()
     transcript_file = (data.get("transcript_file") or "").strip()
-
-    proj_dir = ensure_project(project)
-    tdir = proj_dir / "transcripts"
-    tpath = tdir / transcript_file
-
-    if not tpath.exists():
+    if invalid_project_name(project) or invalid_project_name(transcript_file):
         return {"error": f"{transcript_file} not found in project {project}"}
 
-    text = tpath.read_text(encoding="utf-8")
+    # Storage may be remote (S3), so reads and writes stay off the event loop too
+    try:
+        text = await run_in_threadpool(read_transcript, f"{transcripts_key(project)}/{transcript_file}")
+    except FileNotFoundError:
+        return {"error": f"{transcript_file} not found in project {project}"}
 
-    cached = get_summary(text)
+    cached = await run_in_threadpool(get_summary, text)
     if cached:
         return {"summary": cached, "cached": True}
 
-    result = run_summary(text)
-    save_summary(text, result)
+    # First call may still be loading CrewAI; keep that off the event loop
+    result = await run_in_threadpool(run_summary, text)
+    await run_in_threadpool(save_summary, text, result, project=project,
+                            filename=transcript_file, scoped=False)
+
+    return {"summary": result, "cached": False}
 
-    return {"summary": result, "cached": False}
\ No newline at end of file
+@app.post("/projects/{project}/summarize_all")
+def summarize_all(project: str):
+    """Backfill summaries for every transcript in a project (runs in the background)."""
+    if invalid_project_name(project):
+        return {"error": "invalid project name"}
+    if not project_exists(project):
+        return {"error": f"project '{project}' not found"}
+    return start_job(project, transcripts_key(project))
+
+@app.get("/projects/{project}/summarize_all")
+def summarize_all_progress(project: str):
+    job = get_job(project)
+    if not job:
+        return {"error": f"no batch summarize job for project '{project}'"}
+    return job